@@ -3,27 +3,50 @@ Multi-Agent System for School Absence Data Analysis
 LLM-Powered Agentic AI System with Blackboard Pattern
 """
 
+import importlib
+
 # Blackboard (Shared Memory)
 from .blackboard import Blackboard
 
-# LangGraph Orchestrator
-from .orchestrator_langgraph import LangGraphOrchestrator, AgentState
+# Everything else is imported on first attribute access (PEP 562), so
+# `from agents import Blackboard` does not pull in LangGraph / LangChain / GenAI.
+_LAZY = {
+    # LangGraph Orchestrator
+    'LangGraphOrchestrator': '.orchestrator_langgraph',
+    'AgentState': '.orchestrator_langgraph',
+    # Deterministic Agents
+    'FileUploadAgent': '.file_upload_agent',
+    'DataSelectionAgent': '.data_selection_agent',
+    'DataCleaningAgent': '.data_cleaning_agent',
+    # LLM-Powered Agents
+    'DataAnalysisAgent': '.data_analysis_agent',
+    'DataCleaningAgentLLM': '.data_cleaning_agent_llm',
+    'RatingEngineAgentLLM': '.rating_engine_agent_llm',
+    # Legacy (deterministic) Rating Engine Agent (optional)
+    'RatingEngineAgent': '.rating_engine_agent',
+}
+
+# Optional exports that resolve to None when their module cannot be imported
+_OPTIONAL = {'RatingEngineAgent'}
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(module_name, __name__), name)
+    except ImportError:
+        if name not in _OPTIONAL:
+            raise
+        value = None
+    globals()[name] = value  # cache: later lookups skip __getattr__
+    return value
 
-# Deterministic Agents
-from .file_upload_agent import FileUploadAgent
-from .data_selection_agent import DataSelectionAgent
-from .data_cleaning_agent import DataCleaningAgent
 
-# LLM-Powered Agents
-from .data_analysis_agent import DataAnalysisAgent
-from .data_cleaning_agent_llm import DataCleaningAgentLLM
-from .rating_engine_agent_llm import RatingEngineAgentLLM
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
 
-# Legacy (deterministic) Rating Engine Agent (optional)
-try:
-    from .rating_engine_agent import RatingEngineAgent
-except ImportError:
-    RatingEngineAgent = None
 
 __all__ = [
     'Blackboard',  # Shared memory
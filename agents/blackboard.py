@@ -31,6 +31,8 @@ class Blackboard:
                 "processing_history": []
             }
         }
+        # get_context_summary() result, rebuilt only after a write
+        self._summary_cache: Optional[str] = None
     
     def write(self, key: str, value: Any, agent_name: Optional[str] = None) -> None:
         """
@@ -42,6 +44,7 @@ class Blackboard:
             agent_name: Optional agent name for logging
         """
         self.data[key] = value
+        self._summary_cache = None
         
         # Log the write operation
         if agent_name:
@@ -79,6 +82,9 @@ class Blackboard:
         Returns:
             String summary of blackboard contents
         """
+        if self._summary_cache is not None:
+            return self._summary_cache
+        
         summary = []
         summary.append("=== BLACKBOARD CONTEXT ===\n")
         
@@ -112,7 +118,8 @@ class Blackboard:
         summary.append(f"\nSchool: {self.data['metadata']['school_name'] or 'Unknown'}")
         summary.append(f"Processing Steps: {len(self.data['metadata']['processing_history'])}")
         
-        return "\n".join(summary)
+        self._summary_cache = "\n".join(summary)
+        return self._summary_cache
     
     def clear(self) -> None:
         """Clear all data from blackboard."""
@@ -5,10 +5,25 @@ Responsibility: Understand data structure, identify patterns, suggest cleaning r
 
 import pandas as pd
 from typing import Dict, Any, Optional, Tuple
-from .llm_agent_base import LLMAgentBase
+from .llm_agent_base import LLMAgentBase, is_json_object
 import json
 
 
+def _sample_rows_json(sample: pd.DataFrame) -> str:
+    """
+    Sample rows as a JSON array of records in one C-level pass (DataFrame.to_json) instead of
+    to_dict('records') + json.dumps per cell. Falls back to the dict route for duplicate headers.
+    """
+    if sample.empty:
+        return "[]"
+    try:
+        text = sample.to_json(orient="records", date_format="iso", indent=2, force_ascii=False)
+    except ValueError:
+        return json.dumps(sample.to_dict("records"), indent=2, default=str)
+    # to_json escapes "/" (dates like 01/02/2020); "\/" is just "/" in JSON
+    return text.replace("\\/", "/")
+
+
 class DataAnalysisAgent(LLMAgentBase):
     """
     LLM-powered agent that analyzes uploaded school data.
@@ -47,36 +62,53 @@ Always respond in JSON format with:
 }
 """
     
-    def analyze_data_structure(self, df: pd.DataFrame) -> Dict[str, Any]:
+    def _describe_data(self, df: pd.DataFrame) -> Tuple[Dict[str, Any], str]:
         """
-        Analyze the structure of the uploaded data.
+        Build the data summary shared by the analysis prompts.
         
-        Args:
-            df: DataFrame to analyze
-            
         Returns:
-            Dictionary with analysis results
+            (data_summary dict, the same summary rendered as prompt text)
         """
-        # Prepare data summary for LLM
+        # Prepare data summary for LLM (only columns that actually have missing values)
+        missing = df.isnull().sum()
         data_summary = {
             "rows": len(df),
             "columns": df.columns.tolist(),
             "data_types": df.dtypes.astype(str).to_dict(),
-            "missing_values": df.isnull().sum().to_dict(),
+            "missing_values": missing[missing > 0].to_dict(),
             "sample_rows": df.head(3).to_dict('records') if len(df) > 0 else []
         }
+        # Serialize each block once; the prompt embeds the strings as-is
+        data_types_json = json.dumps(data_summary['data_types'], indent=2)
+        missing_json = json.dumps(data_summary['missing_values'], indent=2) if data_summary['missing_values'] else "none"
+        sample_json = json.dumps(data_summary['sample_rows'], indent=2, default=str)
         
-        # Create prompt for LLM
-        prompt = f"""Analyze this school absence data:
-
-Data Summary:
+        text = f"""Data Summary:
 - Total Rows: {data_summary['rows']}
-- Columns: {', '.join(data_summary['columns'])}
-- Data Types: {json.dumps(data_summary['data_types'], indent=2)}
-- Missing Values: {json.dumps(data_summary['missing_values'], indent=2)}
+- Columns: {', '.join(map(str, data_summary['columns']))}
+- Data Types: {data_types_json}
+- Missing Values: {missing_json}
 
 Sample Data (first 3 rows):
-{json.dumps(data_summary['sample_rows'], indent=2, default=str)}
+{sample_json}"""
+        return data_summary, text
+    
+    def analyze_data_structure(self, df: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Analyze the structure of the uploaded data.
+        
+        Args:
+            df: DataFrame to analyze
+            
+        Returns:
+            Dictionary with analysis results
+        """
+        data_summary, data_text = self._describe_data(df)
+        
+        # Create prompt for LLM
+        prompt = f"""Analyze this school absence data:
+
+{data_text}
 
 Please analyze:
 1. What is the structure and purpose of each column?
@@ -87,7 +119,7 @@ Please analyze:
 Respond in JSON format."""
         
         # Get LLM analysis
-        llm_response = self._call_llm(prompt)
+        llm_response = self._call_llm(prompt, cache_if=is_json_object)
         
         # Try to parse JSON response
         try:
@@ -103,19 +135,26 @@ Respond in JSON format."""
         
         return analysis
     
-    def suggest_cleaning_rules(self, df: pd.DataFrame, school_name: Optional[str] = None) -> Dict[str, Any]:
+    def suggest_cleaning_rules(
+        self,
+        df: pd.DataFrame,
+        school_name: Optional[str] = None,
+        analysis: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
         """
         Suggest cleaning rules based on data analysis.
         
         Args:
             df: DataFrame to analyze
             school_name: Optional school name for context
+            analysis: Result of analyze_data_structure(df) if already available (saves an LLM call)
             
         Returns:
             Dictionary with suggested cleaning rules and reasoning
         """
-        # Analyze data first
-        analysis = self.analyze_data_structure(df)
+        # No analysis yet: get analysis and suggestions from one LLM round trip
+        if analysis is None:
+            return self._analyze_and_suggest(df, school_name)["suggestions"]
         
         # Create prompt for rule suggestions
         prompt = f"""Based on this school absence data analysis:
@@ -142,7 +181,7 @@ Provide your suggestions in JSON format:
 }}
 """
         
-        llm_response = self._call_llm(prompt)
+        llm_response = self._call_llm(prompt, cache_if=is_json_object)
         
         try:
             suggestions = json.loads(llm_response)
@@ -155,6 +194,89 @@ Provide your suggestions in JSON format:
         
         return suggestions
     
+    def _analyze_and_suggest(self, df: pd.DataFrame, school_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Data analysis and cleaning-rule suggestions in a single LLM call
+        (same questions as analyze_data_structure + suggest_cleaning_rules, half the round trips).
+        
+        Returns:
+            {"analysis": {...}, "suggestions": {...}}
+        """
+        data_summary, data_text = self._describe_data(df)
+        
+        prompt = f"""Analyze this school absence data and suggest cleaning rules for it:
+
+{data_text}
+
+School Name: {school_name or 'Unknown'}
+
+Part 1 - analysis:
+1. What is the structure and purpose of each column?
+2. Are there any data quality issues?
+3. What cleaning rules would be appropriate for this school's data?
+4. Are there any school-specific patterns or characteristics?
+
+Part 2 - cleaning rule suggestions, based on your analysis:
+1. Which records should be filtered out? (e.g., Unfilled + NO Substitute)
+2. Which employee types should be included? (e.g., Teachers only)
+3. How should absence days be calculated?
+4. Are there school-specific rules or patterns?
+
+Respond with ONLY one JSON object in this format:
+{{
+    "analysis": {{
+        "data_summary": {{...}},
+        "quality_issues": [...],
+        "suggested_rules": [...],
+        "reasoning": "..."
+    }},
+    "suggestions": {{
+        "filter_rules": [
+            {{"rule": "description", "reasoning": "why", "implementation": "code snippet"}}
+        ],
+        "calculation_rules": [
+            {{"rule": "description", "reasoning": "why", "implementation": "code snippet"}}
+        ],
+        "school_specific_notes": "..."
+    }}
+}}
+"""
+        
+        llm_response = self._call_llm(prompt, cache_if=lambda r: is_json_object(r, code_fence=True))
+        
+        # Extract JSON (handle markdown code blocks)
+        text = llm_response.strip()
+        if "```" in text:
+            start = text.find("{")
+            end = text.rfind("}") + 1
+            if start >= 0 and end > start:
+                text = text[start:end]
+        try:
+            merged = json.loads(text)
+        except json.JSONDecodeError:
+            merged = None
+        if not isinstance(merged, dict):
+            merged = {}
+        
+        analysis = merged.get("analysis")
+        if not isinstance(analysis, dict):
+            # If LLM doesn't return the expected JSON, create structured response
+            analysis = {
+                "data_summary": data_summary,
+                "quality_issues": [],
+                "suggested_rules": [],
+                "reasoning": llm_response
+            }
+        suggestions = merged.get("suggestions")
+        if not isinstance(suggestions, dict):
+            suggestions = {
+                "filter_rules": [],
+                "calculation_rules": [],
+                "school_specific_notes": llm_response
+            }
+        
+        return {"analysis": analysis, "suggestions": suggestions}
+    
     def suggest_column_mapping(
         self, df: pd.DataFrame, standard_columns: list
     ) -> Dict[str, str]:
@@ -173,8 +295,7 @@ Provide your suggestions in JSON format:
             return {}
         # Prepare summary for LLM: column names, sample rows, AND per-column value view so AI can "see" the data
         cols = df.columns.tolist()
-        sample = df.head(5).to_dict("records") if len(df) > 0 else []
-        sample_str = json.dumps(sample, indent=2, default=str)
+        sample_str = _sample_rows_json(df.head(5))
         standard_str = json.dumps(standard_columns)
 
         def _column_value_summary(series, max_categories=12):
@@ -229,7 +350,7 @@ Respond with ONLY a JSON object, no other text. Example: {{"Emp ID": "Employee I
 Use EXACT school column names as keys and EXACT standard names as values.
 """
         try:
-            response = self._call_llm(prompt)
+            response = self._call_llm(prompt, cache_if=lambda r: is_json_object(r, code_fence=True))
             # Extract JSON (handle markdown code blocks)
             text = response.strip()
             if "```" in text:
@@ -260,11 +381,10 @@ Use EXACT school column names as keys and EXACT standard names as values.
         Returns:
             Complete analysis with structure, quality issues, and suggestions
         """
-        analysis = self.analyze_data_structure(df)
-        suggestions = self.suggest_cleaning_rules(df, school_name)
+        result = self._analyze_and_suggest(df, school_name)
         
         return {
-            "analysis": analysis,
-            "suggestions": suggestions,
+            "analysis": result["analysis"],
+            "suggestions": result["suggestions"],
             "school_name": school_name
         }
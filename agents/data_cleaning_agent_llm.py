@@ -8,16 +8,45 @@ summaries; pandas does the heavy data crunching. This keeps token size small, la
 low, and cost down.
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional, Tuple
-from .llm_agent_base import LLMAgentBase
+from .llm_agent_base import LLMAgentBase, is_json_object
+from .data_cleaning_agent import DataCleaningAgent
 from .date_parsing import parse_absence_date_series
+from .school_year import school_year_date_mask
 import json
 
-# Cap categories sent to LLM so prompts stay bounded (e.g. top 50 employee types)
+# Cap categories sent to LLM so prompts stay bounded (e.g. top 50 employee types; Rule 2 keeps types by
+# exact value, so that list stays long). Filled / Absence Type only need their dominant tokens.
 _MAX_CATEGORIES_FOR_LLM = 50
+_TOP_VALUES_FOR_LLM = 10
 _SAMPLE_ROWS_FOR_LLM = 5
 _DATE_MISMATCH_SAMPLE = 20
+# Absence Type values that literally name a duration (others are leave reasons: Sick, Personal, ...)
+_ABSENCE_TYPE_DAYS = DataCleaningAgent.ABSENCE_TYPE_DAYS
+# Low-cardinality label columns stored as category during cleaning (comparisons and counts on int codes),
+# plus the alternate Filled / Needs Substitute headers this agent also understands
+_CATEGORICAL_COLUMNS = DataCleaningAgent.CATEGORICAL_COLUMNS + ('Is Filled', 'Substitute Is Required')
+# Columns the cleaning rules already understand; sample rows go to the LLM only when a file has others
+_KNOWN_COLUMNS = frozenset({
+    'School Year', 'Employee Identifier', 'Employee First Name', 'Employee Last Name', 'Absence_Days',
+    'Date', 'School Name', 'Reason', 'Employee Title', 'Employee Type', 'Absence Type', 'Start Time',
+    'End Time', 'Filled', 'Needs Substitute', 'Is Filled', 'Substitute Is Required', 'Duration',
+    'Absence Reason Usage (Hours)', 'Absence Reason Usage (Days)', 'Days of Absence',
+})
+
+
+def _flags_by_value(series: pd.Series, predicate) -> np.ndarray:
+    """
+    Evaluate a row-wise string predicate once per distinct value and broadcast via codes.
+
+    Filled / Needs Substitute are low-cardinality (a handful of tokens over 100k rows), so the
+    .astype(str).str.* work runs on the uniques instead of every row. Missing values map to False.
+    """
+    codes, uniques = pd.factorize(series)
+    flags = np.asarray(predicate(pd.Series(uniques, dtype=object)), dtype=bool)
+    return np.append(flags, False)[codes]
 
 
 def _rule1_keep_mask(filled_series: pd.Series, needs_series: pd.Series) -> pd.Series:
@@ -27,28 +56,32 @@ def _rule1_keep_mask(filled_series: pd.Series, needs_series: pd.Series) -> pd.Se
     After Step 2 column mapping, columns are often renamed to Filled / Needs Substitute while **values**
     stay district-specific (e.g. Yes/No, Unfilled/YES). Handles string tokens and Excel numeric 0/1.
     """
-    fv = filled_series.astype(str).str.strip().str.lower()
-    nv = needs_series.astype(str).str.strip().str.lower()
-    blank = fv.isin(["", "nan", "none", "nat"]) | nv.isin(["", "nan", "none", "nat"])
-
     def _unfilled(s: pd.Series) -> pd.Series:
         v = s.astype(str).str.strip().str.lower()
         by_text = v.isin(["unfilled", "no", "n", "false", "0", "0.0"])
         n = pd.to_numeric(s, errors="coerce")
         by_num = (n == 0) & n.notna()
-        return by_text | by_num
+        blank = v.isin(["", "nan", "none", "nat"])
+        return (by_text | by_num) & ~blank
 
     def _sub_not_required(s: pd.Series) -> pd.Series:
         v = s.astype(str).str.strip().str.lower()
         by_text = v.isin(["no", "n", "false", "0", "0.0"])
         n = pd.to_numeric(s, errors="coerce")
         by_num = (n == 0) & n.notna()
-        return by_text | by_num
+        blank = v.isin(["", "nan", "none", "nat"])
+        return (by_text | by_num) & ~blank
 
-    is_unfilled = _unfilled(filled_series)
-    sub_not_required = _sub_not_required(needs_series)
-    remove = is_unfilled & sub_not_required & ~blank
-    return ~remove
+    is_unfilled = _flags_by_value(filled_series, _unfilled)
+    sub_not_required = _flags_by_value(needs_series, _sub_not_required)
+    remove = is_unfilled & sub_not_required
+    return pd.Series(~remove, index=filled_series.index)
+
+
+def _first_column(df: pd.DataFrame, name: str) -> pd.Series:
+    """df[name] as a Series even when the name is duplicated (first occurrence wins)."""
+    col = df[name]
+    return col.iloc[:, 0] if isinstance(col, pd.DataFrame) else col
 
 
 def _suggested_rule_bool(rules: Dict[str, Any], key: str, default: bool = True) -> bool:
@@ -83,11 +116,8 @@ class DataCleaningAgentLLM(LLMAgentBase):
     - Apply cleaning rules (deterministic execution)
     """
     
-    def __init__(self, model_provider: str = "google", model_name: Optional[str] = None):
-        super().__init__("DataCleaningAgentLLM", model_provider, model_name)
-    
-    def _get_system_prompt(self) -> str:
-        return """You are a data cleaning expert specializing in school absence data analysis for ABCover's Rating Engine.
+    # Static instruction block: one string object shared by every instance (stable provider cache prefix)
+    _SYSTEM_PROMPT = """You are a data cleaning expert specializing in school absence data analysis for ABCover's Rating Engine.
 
 YOUR EXPERTISE (Based on extensive EDA analysis of multiple schools):
 You have analyzed school absence data for multiple districts (Millburn, Butler, Toms River, Woodbridge, Elbert) and understand the patterns.
@@ -153,6 +183,12 @@ ADAPTATION GUIDELINES:
 Always provide clear reasoning based on the actual data patterns you observe.
 Respond in JSON format with your analysis and suggested rules."""
     
+    def __init__(self, model_provider: str = "google", model_name: Optional[str] = None):
+        super().__init__("DataCleaningAgentLLM", model_provider, model_name)
+    
+    def _get_system_prompt(self) -> str:
+        return self._SYSTEM_PROMPT
+    
     def reason_about_cleaning_rules(self, df: pd.DataFrame, school_name: Optional[str] = None, blackboard_context: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Use LLM to reason about appropriate cleaning rules.
@@ -166,23 +202,34 @@ Respond in JSON format with your analysis and suggested rules."""
         """
         # Prepare data summary for LLM (aggregates + small sample only — never full dataframe)
         def _top_counts(series, n=_MAX_CATEGORIES_FOR_LLM):
+            """Top-n value counts; the remaining tail is folded into one "_other" count."""
             if series is None or series.empty:
                 return {}
             vc = series.value_counts()
-            return vc.head(n).to_dict()
-
+            vc = vc[vc > 0]  # categorical columns also list unused categories
+            top = vc.head(n).to_dict()
+            if len(vc) > n:
+                top["_other"] = int(vc.iloc[n:].sum())
+            return top
+
+        missing = df.isnull().sum()
+        unknown_columns = any(c not in _KNOWN_COLUMNS for c in df.columns)
         data_summary = {
             "rows": len(df),
             "columns": df.columns.tolist(),
-            "sample_data": df.head(_SAMPLE_ROWS_FOR_LLM).to_dict("records") if len(df) > 0 else [],
+            "sample_data": (
+                df.head(_SAMPLE_ROWS_FOR_LLM).to_dict("records") if unknown_columns and len(df) > 0 else []
+            ),
             "employee_types": _top_counts(df["Employee Type"]) if "Employee Type" in df.columns else {},
             "filled_status": (
-                _top_counts(df["Filled"]) if "Filled" in df.columns
-                else _top_counts(df["Is Filled"]) if "Is Filled" in df.columns
+                _top_counts(df["Filled"], n=_TOP_VALUES_FOR_LLM) if "Filled" in df.columns
+                else _top_counts(df["Is Filled"], n=_TOP_VALUES_FOR_LLM) if "Is Filled" in df.columns
                 else {}
             ),
-            "absence_types": _top_counts(df["Absence Type"]) if "Absence Type" in df.columns else {},
-            "missing_values": df.isnull().sum().to_dict(),
+            "absence_types": (
+                _top_counts(df["Absence Type"], n=_TOP_VALUES_FOR_LLM) if "Absence Type" in df.columns else {}
+            ),
+            "missing_values": missing[missing > 0].to_dict(),
         }
         
         # Add school year and date information for Rule 3 validation (aggregates only)
@@ -194,25 +241,16 @@ Respond in JSON format with your analysis and suggested rules."""
                 "max": str(df['Date'].max()) if not df['Date'].isna().all() else None
             }
             
-            # Check for potential date mismatches (small sample only — never full dataset)
-            date_mismatches = []
-            sample_size = min(_DATE_MISMATCH_SAMPLE, len(df))
-            for idx, row in df.head(sample_size).iterrows():
-                school_year = row.get('School Year')
-                date = row.get('Date')
-                if pd.notna(school_year) and pd.notna(date):
-                    try:
-                        parts = str(school_year).split('-')
-                        if len(parts) == 2:
-                            start_year = int(parts[0])
-                            end_year = int(parts[1])
-                            start_date = pd.Timestamp(year=start_year, month=7, day=1)
-                            end_date = pd.Timestamp(year=end_year, month=6, day=30)
-                            date_ts = pd.to_datetime(date)
-                            if not (start_date <= date_ts <= end_date):
-                                date_mismatches.append(f"School Year {school_year} has date {date}")
-                    except:
-                        pass
+            # Check for potential date mismatches (small sample only — never full dataset),
+            # using the same School Year window as Rule 3
+            sample = df.head(_DATE_MISMATCH_SAMPLE)
+            sample_sy = _first_column(sample, 'School Year')
+            sample_dates = _first_column(sample, 'Date')
+            mismatched = ~school_year_date_mask(sample_sy, sample_dates)
+            date_mismatches = [
+                f"School Year {school_year} has date {date}"
+                for school_year, date in zip(sample_sy[mismatched], sample_dates[mismatched])
+            ]
             
             if date_mismatches:
                 data_summary["date_validation_issues"] = date_mismatches[:10]
@@ -235,6 +273,25 @@ BLACKBOARD CONTEXT (Full workflow history):
 - IMPORTANT: If user already filtered Employee Types, RESPECT their selection. Do not filter again.
 """
         
+        # Everything the model should look at goes out as one JSON document (a single json.dumps).
+        # Value-count dicts show the actual values in this file; sample rows only when the file has
+        # columns the counts do not already explain.
+        payload = {
+            "total_rows": data_summary['rows'],
+            "columns": [str(c) for c in data_summary['columns']],
+            "employee_types": data_summary['employee_types'],
+            "filled_status": data_summary['filled_status'],
+            "absence_types": data_summary['absence_types'],
+            "missing_values": data_summary['missing_values'] or "none",
+            "school_years": data_summary.get('school_years', {}),
+            "date_range": data_summary.get('date_range', {}),
+        }
+        if data_summary.get('date_validation_issues'):
+            payload["date_validation_issues_found"] = data_summary['date_validation_issues']
+        if data_summary['sample_data']:
+            payload["sample_rows"] = data_summary['sample_data']
+        payload_json = json.dumps(payload, indent=2, default=str)
+        
         prompt = f"""Analyze this school absence data and reason about appropriate cleaning rules.
 
 **First, look at the actual values in the data below.** Use what you see to reason:
@@ -245,19 +302,8 @@ BLACKBOARD CONTEXT (Full workflow history):
 
 School: {school_name or 'Unknown'}
 {context_info}
-Data Summary (look at these values when reasoning):
-- Total Rows: {data_summary['rows']:,}
-- Columns: {', '.join(data_summary['columns'])}
-- Employee Types (actual values in data): {json.dumps(data_summary['employee_types'], indent=2)}
-- Filled Status (actual values in data): {json.dumps(data_summary['filled_status'], indent=2)}
-- Absence Types (actual values in data): {json.dumps(data_summary['absence_types'], indent=2)}
-- Missing Values: {json.dumps(data_summary['missing_values'], indent=2)}
-- School Years: {json.dumps(data_summary.get('school_years', {}), indent=2)}
-- Date Range: {json.dumps(data_summary.get('date_range', {}), indent=2)}
-{f"- Date Validation Issues Found: {json.dumps(data_summary.get('date_validation_issues', []), indent=2)}" if data_summary.get('date_validation_issues') else ""}
-
-Sample Data (first 5 rows):
-{json.dumps(data_summary['sample_data'], indent=2, default=str)}
+Data Summary (JSON; look at these values when reasoning):
+{payload_json}
 
 Please reason about:
 1. DATA FORMAT VALIDATION (Check first):
@@ -299,7 +345,7 @@ Provide your reasoning and suggested rules in JSON format:
 }}
 """
         
-        llm_response = self._call_llm(prompt)
+        llm_response = self._call_llm(prompt, cache_if=is_json_object)
         
         try:
             reasoning = json.loads(llm_response)
@@ -325,45 +371,49 @@ Provide your reasoning and suggested rules in JSON format:
         """Validate data format before business rules. Delegates to run_validation() for UI reuse."""
         return run_validation(df)
 
-    def apply_rule1(self, df: pd.DataFrame, should_apply: bool = True) -> pd.DataFrame:
+    def apply_rule1(self, df: pd.DataFrame, should_apply: bool = True, copy: bool = True) -> pd.DataFrame:
         """
         Rule 1: Remove absences that are unfilled and do not require substitute coverage.
 
         Uses standard names **Filled** and **Needs Substitute** (after user column mapping) with **semantic**
         value matching so Yes/No exports behave like Unfilled/YES (Frontline). If those columns are missing,
         falls back to common raw names Is Filled / Substitute Is Required.
+        copy=False returns the plain slice (for callers that only read it).
         """
-        if not should_apply:
-            return df.copy()
-
-        df = df.copy()
-
-        if "Filled" in df.columns and "Needs Substitute" in df.columns:
-            mask = _rule1_keep_mask(df["Filled"], df["Needs Substitute"])
-            return df[mask].copy()
-
-        if "Is Filled" in df.columns and "Substitute Is Required" in df.columns:
-            mask = _rule1_keep_mask(df["Is Filled"], df["Substitute Is Required"])
-            return df[mask].copy()
-
-        return df.copy()
+        kept = df[self.rule1_mask(df, should_apply)]
+        return kept.copy() if copy else kept
+
+    def rule1_mask(self, df: pd.DataFrame, should_apply: bool = True) -> pd.Series:
+        """Row mask for Rule 1 (True = keep)."""
+        if should_apply:
+            if "Filled" in df.columns and "Needs Substitute" in df.columns:
+                return _rule1_keep_mask(df["Filled"], df["Needs Substitute"])
+            if "Is Filled" in df.columns and "Substitute Is Required" in df.columns:
+                return _rule1_keep_mask(df["Is Filled"], df["Substitute Is Required"])
+        return pd.Series(True, index=df.index)
     
-    def apply_rule2(self, df: pd.DataFrame, employee_types_to_keep: list) -> pd.DataFrame:
+    def apply_rule2(self, df: pd.DataFrame, employee_types_to_keep: list, copy: bool = True) -> pd.DataFrame:
         """
         Rule 2: Keep only specified employee types
         
         Args:
             df: DataFrame to clean
             employee_types_to_keep: List of employee types to keep (from LLM reasoning)
+            copy: If False, return the plain slice (caller only reads it)
             
         Returns:
             Cleaned DataFrame
         """
+        kept = df[self.rule2_mask(df, employee_types_to_keep)]
+        return kept.copy() if copy else kept
+    
+    def rule2_mask(self, df: pd.DataFrame, employee_types_to_keep: list) -> pd.Series:
+        """Row mask for Rule 2 (True = keep)."""
         if 'Employee Type' in df.columns and employee_types_to_keep:
-            return df[df['Employee Type'].isin(employee_types_to_keep)].copy()
-        return df.copy()
+            return _first_column(df, 'Employee Type').isin(employee_types_to_keep)
+        return pd.Series(True, index=df.index)
     
-    def apply_rule3(self, df: pd.DataFrame, should_apply: bool = True) -> pd.DataFrame:
+    def apply_rule3(self, df: pd.DataFrame, should_apply: bool = True, copy: bool = True) -> pd.DataFrame:
         """
         Rule 3: Validate that dates match their School Year (July 1 - June 30 calendar).
         
@@ -373,137 +423,97 @@ Provide your reasoning and suggested rules in JSON format:
         Args:
             df: DataFrame to clean
             should_apply: Whether to apply this rule (from LLM reasoning)
+            copy: If False, return the plain slice (caller only reads it)
             
         Returns:
             Cleaned DataFrame with mismatched records removed
         """
-        if not should_apply:
-            return df.copy()
-        
-        if 'School Year' not in df.columns or 'Date' not in df.columns:
-            return df.copy()
-        
-        df = df.copy()
-        
-        def get_school_year_range(school_year_str):
-            """
-            Parse School Year string and return (start_date, end_date).
-            Example: "2020-2021" -> (July 1, 2020, June 30, 2021)
-            """
-            try:
-                # Parse "YYYY-YYYY" format
-                parts = str(school_year_str).split('-')
-                if len(parts) == 2:
-                    start_year = int(parts[0])
-                    end_year = int(parts[1])
-                    # School year: July 1, start_year to June 30, end_year
-                    start_date = pd.Timestamp(year=start_year, month=7, day=1)
-                    end_date = pd.Timestamp(year=end_year, month=6, day=30)
-                    return start_date, end_date
-            except (ValueError, AttributeError):
-                pass
-            return None, None
-        
-        # Create mask for valid dates
-        valid_mask = pd.Series([True] * len(df), index=df.index)
-        
-        for idx, row in df.iterrows():
-            school_year = row.get('School Year')
-            date = row.get('Date')
-            
-            if pd.isna(school_year) or pd.isna(date):
-                continue  # Skip if missing data
-            
-            # Get school year date range
-            start_date, end_date = get_school_year_range(school_year)
-            
-            if start_date is None or end_date is None:
-                continue  # Skip if can't parse school year
-            
-            # Convert date to Timestamp if needed
-            if not isinstance(date, pd.Timestamp):
-                try:
-                    date = pd.to_datetime(date)
-                except:
-                    valid_mask[idx] = False
-                    continue
-            
-            # Check if date falls within school year range
-            if not (start_date <= date <= end_date):
-                valid_mask[idx] = False
-        
-        return df[valid_mask].copy()
-    
-    def calculate_absence_days(self, df: pd.DataFrame) -> pd.DataFrame:
+        kept = df[self.rule3_mask(df, should_apply)]
+        return kept.copy() if copy else kept
+
+    def rule3_mask(self, df: pd.DataFrame, should_apply: bool = True) -> pd.Series:
+        """Row mask for Rule 3 (True = keep; rows whose School Year / Date cannot be checked are kept)."""
+        if should_apply and 'School Year' in df.columns and 'Date' in df.columns:
+            return school_year_date_mask(_first_column(df, 'School Year'), _first_column(df, 'Date'))
+        return pd.Series(True, index=df.index)
+
+    def calculate_absence_days(self, df: pd.DataFrame, copy: bool = True) -> pd.DataFrame:
         """
         Calculate absence days. Priority: (1) existing Absence_Days if already in days,
         (2) Duration (hours) / 7.5, (3) Start Time & End Time difference / 7.5,
         (4) Absence Type only when it is literally Full Day / Half Day (many files use
         Absence Type for reason e.g. Sick, Personal — we focus on Duration and times).
+        copy=False adds the column to df in place (caller owns df).
         """
-        df = df.copy()
+        if copy:
+            df = df.copy()
         HOURS_PER_DAY = 7.5
 
-        def _numeric(val):
+        def _numeric(col: str) -> Optional[pd.Series]:
             """
-            Safely coerce scalar/Series/DataFrame-like values to one float.
-            This prevents crashes when duplicate columns make row values Series.
+            Column as floats (NaN when not numeric); None if the column is absent.
+            With duplicate column names the first non-null numeric value per row wins.
             """
-            if isinstance(val, pd.DataFrame):
-                s = pd.to_numeric(val.stack(), errors='coerce').dropna()
-                return float(s.iloc[0]) if len(s) else None
-            if isinstance(val, pd.Series):
-                s = pd.to_numeric(val, errors='coerce').dropna()
-                return float(s.iloc[0]) if len(s) else None
-            v = pd.to_numeric(val, errors='coerce')
-            return float(v) if pd.notna(v) else None
-
-        def calculate_days(row):
-            # 1) Day count already on file (column names vary by SIS export)
-            for col in ('Absence_Days', 'Absence Reason Usage (Days)', 'Days of Absence'):
-                if col not in row.index:
-                    continue
-                existing = row.get(col)
-                if existing is not None:
-                    v = _numeric(existing)
-                    if v is not None and v >= 0:
-                        return v
-
-            # 2) Duration in hours -> days
-            hours = None
-            if 'Duration' in row.index:
-                hours = _numeric(row.get('Duration'))
-            if hours is None and 'Absence Reason Usage (Hours)' in row.index:
-                hours = _numeric(row.get('Absence Reason Usage (Hours)'))
-            if hours is not None and hours >= 0:
-                return hours / HOURS_PER_DAY
-
-            # 3) Start Time & End Time -> duration in hours -> days
-            if 'Start Time' in row and 'End Time' in row:
-                try:
-                    st = pd.to_datetime(row['Start Time'], errors='coerce')
-                    et = pd.to_datetime(row['End Time'], errors='coerce')
-                    if pd.notna(st) and pd.notna(et):
-                        delta = (et - st).total_seconds() / 3600
-                        if delta >= 0:
-                            return delta / HOURS_PER_DAY
-                except Exception:
-                    pass
-
-            # 4) Absence Type only when it explicitly means duration type (Full Day / Half Day)
-            abs_type = str(row.get('Absence Type', '')).strip()
-            if abs_type == 'Full Day':
-                return 1.0
-            if abs_type in ('AM Half Day', 'PM Half Day'):
-                return 0.5
-            if abs_type == 'Custom Duration' and 'Duration' in row:
-                hours = _numeric(row['Duration'])
-                if hours is not None and hours >= 0:
-                    return hours / HOURS_PER_DAY
-
-            return 0.0
-
-        df['Absence_Days'] = df.apply(calculate_days, axis=1)
+            positions = [i for i, c in enumerate(df.columns) if c == col]
+            if not positions:
+                return None
+            if len(positions) == 1:
+                return pd.to_numeric(df.iloc[:, positions[0]], errors='coerce').astype(float)
+            values = df.iloc[:, positions].apply(pd.to_numeric, errors='coerce').astype(float)
+            return values.bfill(axis=1).iloc[:, 0]
+
+        conditions = []
+        choices = []
+
+        # 1) Day count already on file (column names vary by SIS export)
+        for col in ('Absence_Days', 'Absence Reason Usage (Days)', 'Days of Absence'):
+            existing = _numeric(col)
+            if existing is not None:
+                conditions.append(existing >= 0)
+                choices.append(existing)
+
+        # 2) Duration in hours -> days (Absence Reason Usage (Hours) only where Duration is empty)
+        hours = _numeric('Duration')
+        usage_hours = _numeric('Absence Reason Usage (Hours)')
+        if hours is None:
+            hours = usage_hours
+        elif usage_hours is not None:
+            hours = hours.fillna(usage_hours)
+        if hours is not None:
+            conditions.append(hours >= 0)
+            choices.append(hours / HOURS_PER_DAY)
+
+        # 3) Start Time & End Time -> duration in hours -> days
+        if 'Start Time' in df.columns and 'End Time' in df.columns:
+            try:
+                st = pd.to_datetime(df['Start Time'], errors='coerce', format='mixed')
+                et = pd.to_datetime(df['End Time'], errors='coerce', format='mixed')
+                delta = (et - st).dt.total_seconds() / 3600
+                conditions.append(delta >= 0)
+                choices.append(delta / HOURS_PER_DAY)
+            except Exception:
+                pass
+
+        # 4) Absence Type only when it explicitly means duration type (Full Day / Half Day)
+        #    (Custom Duration with valid hours is already covered by step 2)
+        #    Looked up once per distinct value and broadcast through factorize codes
+        if 'Absence Type' in df.columns:
+            codes, uniques = pd.factorize(_first_column(df, 'Absence Type'))
+            lookup = np.array(
+                [_ABSENCE_TYPE_DAYS.get(str(u).strip(), np.nan) for u in uniques] + [np.nan]
+            )
+            type_days = lookup[codes]
+            conditions.append(~np.isnan(type_days))
+            choices.append(type_days)
+
+        if not conditions:
+            df['Absence_Days'] = 0.0
+            return df
+
+        # np.select takes the first matching condition per row: same priority as the old row loop
+        df['Absence_Days'] = np.select(
+            [np.asarray(c, dtype=bool) for c in conditions], choices, default=0.0
+        ).astype(float)
         return df
     
     def process(self, df: pd.DataFrame, school_name: Optional[str] = None, blackboard_context: Optional[Dict] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
@@ -537,19 +547,33 @@ Provide your reasoning and suggested rules in JSON format:
         stats['validation_report'] = validation_report
         stats['rows_removed'] += validation_report.get('rows_removed', 0)
         
+        # Low-cardinality label columns as category. astype returns a new frame, so the caller's
+        # frame (which validation may pass through as-is) is never modified; copy=False only skips
+        # copying the columns left unchanged. Rule 1/2 lookups, value_counts and the groupbys
+        # downstream then work on small integer codes.
+        to_category = {
+            c: 'category' for c in _CATEGORICAL_COLUMNS
+            if c in df.columns and isinstance(df[c], pd.Series) and df[c].dtype == object
+        }
+        if to_category:
+            df = df.astype(to_category, copy=False)
+        
         # Step 1: LLM reasons about cleaning rules (with blackboard context)
         reasoning = self.reason_about_cleaning_rules(df, school_name, blackboard_context)
         stats['llm_reasoning'] = reasoning.get('reasoning', '')
         stats['suggested_rules'] = reasoning.get('suggested_rules', {})
         stats['data_quality_issues'] = reasoning.get('data_quality_issues', [])
         
+        # Rules 1-3 are evaluated as row masks on the validated frame and combined; the kept rows
+        # are materialized once at the end, and after_ruleN come from the running mask counts.
+        
         # Step 2: Rule 1 — core substitute-coverage rule; must run whenever Filled/Needs Substitute exist.
         # Do not let the LLM turn this off (it often mis-reads Yes/No files and sets remove=false).
         rule1_cols = _rule1_columns_present(df)
         llm_rule1 = _suggested_rule_bool(stats["suggested_rules"], "remove_unfilled_no_substitute", True)
         apply_rule1_flag = bool(llm_rule1) if not rule1_cols else True
-        df = self.apply_rule1(df, apply_rule1_flag)
-        stats["after_rule1"] = len(df)
+        keep = self.rule1_mask(df, apply_rule1_flag).to_numpy(dtype=bool)
+        stats["after_rule1"] = int(keep.sum())
         stats["rule1_columns_detected"] = rule1_cols
         stats["rule1_llm_would_apply"] = llm_rule1
         
@@ -560,15 +584,15 @@ Provide your reasoning and suggested rules in JSON format:
         
         if user_already_filtered and user_selected_types:
             # User already filtered - don't filter again, just validate
-            stats['after_rule2'] = len(df)  # No change, user already filtered
+            stats['after_rule2'] = stats['after_rule1']  # No change, user already filtered
             stats['user_filtered_employee_types'] = user_selected_types
             stats['rule2_applied'] = False  # We didn't apply it, user did
         else:
             # User didn't filter - apply LLM reasoning
             employee_types = stats['suggested_rules'].get('employee_types_to_keep', 
                                                           ['Teacher', 'Teacher Music', 'Teacher SpecEd'])
-            df = self.apply_rule2(df, employee_types)
-            stats['after_rule2'] = len(df)
+            keep &= self.rule2_mask(df, employee_types).to_numpy(dtype=bool)
+            stats['after_rule2'] = int(keep.sum())
             stats['rule2_applied'] = True  # We applied it
             stats['llm_selected_employee_types'] = employee_types
         
@@ -576,11 +600,15 @@ Provide your reasoning and suggested rules in JSON format:
         should_validate_dates = stats['suggested_rules'].get('validate_school_year_dates', True)
         if 'School Year' in df.columns and 'Date' in df.columns:
             should_validate_dates = True  # Force Rule 3 to match test_toms_river logic
-        df = self.apply_rule3(df, should_validate_dates)
-        stats['after_rule3'] = len(df)
+        keep &= self.rule3_mask(df, should_validate_dates).to_numpy(dtype=bool)
+        stats['after_rule3'] = int(keep.sum())
+        
+        # One slice for all three rules; take() returns a frame we own, so Absence_Days
+        # is added to it directly instead of through another full copy
+        df = df.take(np.flatnonzero(keep))
         
         # Step 5: Calculate absence days (deterministic - it's math)
-        df = self.calculate_absence_days(df)
+        df = self.calculate_absence_days(df, copy=False)
         
         stats['final_rows'] = len(df)
         stats['rows_removed'] = original_rows - len(df)
@@ -593,9 +621,11 @@ def run_validation(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     Standalone data validation (no LLM). Use for first-class validation step in UI.
     Checks: required columns, data types, date format, empty rows, invalid values.
     Returns:
-        Tuple of (validated DataFrame, validation_report dict).
+        Tuple of (validated DataFrame, validation_report dict). The input frame is never modified;
+        it is copied only when a column actually has to be rewritten (an already-clean frame is
+        returned as-is).
     """
-    df = df.copy()
+    owned = False  # True once df is a frame this function created (safe to assign columns)
     validation_report = {
         'format_issues': [],
         'rows_removed': 0,
@@ -611,19 +641,26 @@ def run_validation(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         validation_report['format_issues'].append(f"Missing required columns: {missing_columns}")
 
     if not df.empty:
-        df = df.dropna(how='all')
-        validation_report['rows_removed'] += original_rows - len(df)
-        if original_rows != len(df):
+        empty_rows = df.isna().all(axis=1).to_numpy()
+        if empty_rows.any():
+            df = df.take(np.flatnonzero(~empty_rows))
+            owned = True
+            validation_report['rows_removed'] += original_rows - len(df)
             validation_report['format_issues'].append(f"Removed {original_rows - len(df)} completely empty rows")
 
     if 'Date' in df.columns:
         validation_report['columns_checked'].append('Date')
         try:
-            df['Date'] = parse_absence_date_series(df['Date'])
-            invalid_dates = df['Date'].isna().sum()
+            if not pd.api.types.is_datetime64_any_dtype(df['Date']):
+                if not owned:
+                    df, owned = df.copy(), True
+                df['Date'] = parse_absence_date_series(df['Date'])
+            invalid = df['Date'].isna().to_numpy()
+            invalid_dates = int(invalid.sum())
             if invalid_dates > 0:
                 validation_report['data_type_issues'].append(f"Date: {invalid_dates} invalid date values")
-                df = df[df['Date'].notna()]
+                df = df.take(np.flatnonzero(~invalid))
+                owned = True
                 validation_report['rows_removed'] += invalid_dates
         except Exception as e:
             validation_report['format_issues'].append(f"Date column format error: {str(e)}")
@@ -631,7 +668,10 @@ def run_validation(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
     if 'Duration' in df.columns:
         validation_report['columns_checked'].append('Duration')
         try:
-            df['Duration'] = pd.to_numeric(df['Duration'], errors='coerce')
+            if not pd.api.types.is_numeric_dtype(df['Duration']):
+                if not owned:
+                    df, owned = df.copy(), True
+                df['Duration'] = pd.to_numeric(df['Duration'], errors='coerce')
             negative_durations = (df['Duration'] < 0).sum()
             if negative_durations > 0:
                 validation_report['invalid_values'].append(f"Duration: {negative_durations} negative values found")
@@ -640,12 +680,12 @@ def run_validation(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
 
     if 'School Year' in df.columns:
         validation_report['columns_checked'].append('School Year')
-        invalid_school_years = 0
-        for idx, row in df.iterrows():
-            school_year = str(row.get('School Year', ''))
-            if pd.notna(row.get('School Year')):
-                if not (len(school_year) == 9 and school_year[4] == '-'):
-                    invalid_school_years += 1
+        # "YYYY-YYYY" shape check, evaluated once per distinct label (missing labels are not counted)
+        def _malformed(s: pd.Series) -> pd.Series:
+            v = s.astype(str)
+            return ~((v.str.len() == 9) & (v.str[4] == '-'))
+
+        invalid_school_years = int(_flags_by_value(_first_column(df, 'School Year'), _malformed).sum())
         if invalid_school_years > 0:
             validation_report['format_issues'].append(f"School Year: {invalid_school_years} records with invalid format")
 
@@ -654,6 +694,14 @@ def run_validation(df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, Any]]:
         empty_identifiers = df['Employee Identifier'].isna().sum()
         if empty_identifiers > 0:
             validation_report['format_issues'].append(f"Employee Identifier: {empty_identifiers} missing values (kept for EDA parity)")
+        elif pd.api.types.is_integer_dtype(df['Employee Identifier']):
+            # Integer IDs rarely need int64; smaller keys mean less memory moved by the groupbys downstream.
+            # Day/Duration columns stay float64 so premium sums are not affected by float32 rounding.
+            ids = pd.to_numeric(df['Employee Identifier'], downcast='integer')
+            if ids.dtype != df['Employee Identifier'].dtype:
+                if not owned:
+                    df, owned = df.copy(), True
+                df['Employee Identifier'] = ids
 
     validation_report['final_rows'] = len(df)
     validation_report['rows_removed'] = original_rows - len(df)
@@ -3,6 +3,7 @@ DataSelectionAgent - Handles column and row selection
 Responsibility: Let user select which columns/rows to keep
 """
 
+import numpy as np
 import pandas as pd
 from typing import List, Optional, Dict, Tuple
 
@@ -22,10 +23,22 @@ class DataSelectionAgent:
     
     def __init__(self):
         self.name = "DataSelectionAgent"
+        # (columns Index, its list) from the last get_available_columns call
+        self._cols_cache: Optional[Tuple[pd.Index, List[str]]] = None
     
     def get_available_columns(self, df: pd.DataFrame) -> List[str]:
-        """Get list of available columns in the DataFrame."""
-        return df.columns.tolist()
+        """
+        Get list of available columns in the DataFrame.
+        Streamlit reruns ask again for the same frame; an Index is immutable, so the list built for
+        that exact Index object is returned again (compared by identity, so a recycled id() can never
+        hand back another frame's columns).
+        """
+        cached = self._cols_cache
+        if cached is not None and cached[0] is df.columns:
+            return cached[1]
+        cols = df.columns.tolist()
+        self._cols_cache = (df.columns, cols)
+        return cols
     
     def select_columns(self, df: pd.DataFrame, selected_columns: List[str]) -> Tuple[pd.DataFrame, Optional[str]]:
         """
@@ -39,8 +52,8 @@ class DataSelectionAgent:
             Tuple of (filtered DataFrame, error_message)
         """
         try:
-            # Validate selected columns exist
-            missing_cols = [col for col in selected_columns if col not in df.columns]
+            # Validate selected columns exist (one hashtable pass over the Index, request order kept)
+            missing_cols = pd.Index(selected_columns).difference(df.columns, sort=False).tolist()
             if missing_cols:
                 return df, f"Warning: Columns not found: {missing_cols}"
             
@@ -48,11 +61,16 @@ class DataSelectionAgent:
             seen = set()
             unique_cols = [c for c in selected_columns if c not in seen and not seen.add(c)]
             
-            # Select columns
-            filtered_df = df[unique_cols].copy()
-            # Deduplicate in case df had duplicate column names (df[cols] can return dups)
-            if filtered_df.columns.duplicated().any():
-                filtered_df = filtered_df.loc[:, ~filtered_df.columns.duplicated()]
+            # Select columns by position: take() builds the projected frame once (no second
+            # .copy()), and a name that appears twice in df (duplicate headers) resolves to its
+            # first column instead of pulling in both
+            columns = df.columns
+            if columns.is_unique:
+                positions = columns.get_indexer(unique_cols)
+            else:
+                first = ~columns.duplicated()
+                positions = np.flatnonzero(first)[columns[first].get_indexer(unique_cols)]
+            filtered_df = df.take(positions, axis=1)
 
             if filtered_df.empty:
                 return df, "Warning: No data after column selection"
@@ -77,54 +95,84 @@ class DataSelectionAgent:
                 }
         
         Returns:
-            Tuple of (filtered DataFrame, error_message)
+            Tuple of (filtered DataFrame, error_message). When no row is filtered out and no column
+            has to be rewritten, the input frame itself is returned (no copy).
         """
         try:
-            filtered_df = df.copy()
+            base = df
             
             # Deduplicate columns - pandas raises "cannot assemble with duplicate keys" when
             # to_datetime/isin get multiple columns with same name (e.g. after rename collisions)
-            if filtered_df.columns.duplicated().any():
-                filtered_df = filtered_df.loc[:, ~filtered_df.columns.duplicated()]
+            if not base.columns.is_unique:
+                base = base.take(np.flatnonzero(~base.columns.duplicated()), axis=1)
+            
+            # Every filter is evaluated against the same frame and ANDed into one mask;
+            # the kept rows are then sliced out once
+            masks = []
+            span = slice(None)  # row range the date filter narrowed a sorted Date column to
+            parsed_dates = None  # Date column as datetime64 when the date filter had to parse it
             
             # Filter by date range
             if 'date_range' in filters and filters['date_range']:
                 start_date, end_date = filters['date_range']
-                if 'Date' in filtered_df.columns:
+                if 'Date' in base.columns:
                     # Convert date_range to datetime if needed
-                    if not pd.api.types.is_datetime64_any_dtype(filtered_df['Date']):
-                        filtered_df['Date'] = parse_absence_date_series(filtered_df['Date'])
+                    dates = base['Date']
+                    if not pd.api.types.is_datetime64_any_dtype(dates):
+                        dates = parsed_dates = parse_absence_date_series(dates)
                     
                     # Convert start_date and end_date to Timestamp for comparison
                     start_date = pd.Timestamp(start_date) if start_date else None
                     end_date = pd.Timestamp(end_date) if end_date else None
                     
                     if start_date and end_date:
-                        filtered_df = filtered_df[
-                            (filtered_df['Date'] >= start_date) & 
-                            (filtered_df['Date'] <= end_date)
-                        ]
-            
-            # Filter by employee type
-            if 'employee_type' in filters and filters['employee_type']:
-                if 'Employee Type' in filtered_df.columns:
-                    filtered_df = filtered_df[
-                        filtered_df['Employee Type'].isin(filters['employee_type'])
-                    ]
+                        if (
+                            isinstance(dates.dtype, np.dtype) and dates.dtype.kind == 'M'
+                            and start_date.tz is None and end_date.tz is None
+                            and dates.is_monotonic_increasing
+                        ):
+                            # Sorted export (no NaT): two binary searches bound the range, so the
+                            # other filters only look at rows inside it and no date mask is built
+                            values = dates.to_numpy()
+                            span = slice(
+                                int(np.searchsorted(values, start_date.to_datetime64(), side='left')),
+                                int(np.searchsorted(values, end_date.to_datetime64(), side='right')),
+                            )
+                        else:
+                            masks.append(((dates >= start_date) & (dates <= end_date)).to_numpy())
             
-            # Filter by filled status
-            if 'filled_status' in filters and filters['filled_status']:
-                if 'Filled' in filtered_df.columns:
-                    filtered_df = filtered_df[
-                        filtered_df['Filled'].isin(filters['filled_status'])
-                    ]
+            # Filter by employee type / filled status / school year
+            for key, col in (
+                ('employee_type', 'Employee Type'),
+                ('filled_status', 'Filled'),
+                ('school_year', 'School Year'),
+            ):
+                if key in filters and filters[key] and col in base.columns:
+                    column = base[col]
+                    if (
+                        isinstance(column.dtype, pd.CategoricalDtype)
+                        and column.cat.categories.isin(filters[key]).all()
+                        and not column.hasnans
+                    ):
+                        continue  # every label is selected and none is missing: mask would be all True
+                    masks.append(column.iloc[span].isin(filters[key]).to_numpy())
             
-            # Filter by school year
-            if 'school_year' in filters and filters['school_year']:
-                if 'School Year' in filtered_df.columns:
-                    filtered_df = filtered_df[
-                        filtered_df['School Year'].isin(filters['school_year'])
-                    ]
+            if masks:
+                keep = np.logical_and.reduce(masks)
+                rows = None if span == slice(None) and keep.all() else np.flatnonzero(keep) + (span.start or 0)
+            elif span != slice(None):
+                rows = np.arange(span.start, max(span.start, span.stop))
+            else:
+                rows = None
+            if rows is None:
+                # Nothing filtered out (no active filter, or every row passes): return the frame
+                # itself, copied only when the parsed Date column is written into it below
+                filtered_df = base if parsed_dates is None else base.copy()
+            else:
+                filtered_df = base.take(rows)
+            if parsed_dates is not None:
+                values = parsed_dates.to_numpy()
+                filtered_df['Date'] = values if rows is None else values[rows]
             
             if filtered_df.empty:
                 return df, "Warning: No data after applying filters"
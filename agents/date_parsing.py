@@ -4,6 +4,10 @@ Robust absence-date parsing for mixed exports (ISO + US m/d/y in the same column
 
 from __future__ import annotations
 
+import threading
+from typing import Any, Dict, Tuple
+
+import numpy as np
 import pandas as pd
 
 # Try in order; later passes only fill rows still NaT (multiple formats in one column).
@@ -20,16 +24,17 @@ _ABSENCE_DATE_FORMATS = [
     "%d-%b-%Y",
 ]
 
+# Parsed value per distinct raw date, shared by every caller (Step 2 caption, selection filter,
+# validation, Rule 3, School Year derivation) so Streamlit reruns re-parse only unseen strings.
+# Keyed by (type, value) so e.g. 1 and True never share an entry. Parsing is per value, so a
+# cached result is exactly what the format cascade would produce again.
+_MAX_CACHED_DATES = 100_000
+_PARSED_DATE_CACHE: Dict[Tuple[type, Any], np.datetime64] = {}
+_PARSED_DATE_CACHE_LOCK = threading.Lock()
 
-def parse_absence_date_series(ser: pd.Series) -> pd.Series:
-    """
-    Parse a date column that may mix ISO datetimes and US-style strings in one file.
-    """
-    if ser is None or len(ser) == 0:
-        return pd.to_datetime(ser, errors="coerce")
-    if pd.api.types.is_datetime64_any_dtype(ser):
-        return ser
 
+def _parse_formats(ser: pd.Series) -> pd.Series:
+    """Format cascade over ``ser``; later passes only fill rows still NaT."""
     out = pd.Series(pd.NaT, index=ser.index, dtype="datetime64[ns]")
     for fmt in _ABSENCE_DATE_FORMATS:
         need = out.isna()
@@ -45,3 +50,37 @@ def parse_absence_date_series(ser: pd.Series) -> pd.Series:
         out.loc[rest.index] = mixed
 
     return out
+
+
+def parse_absence_date_series(ser: pd.Series) -> pd.Series:
+    """
+    Parse a date column that may mix ISO datetimes and US-style strings in one file.
+
+    Absence exports repeat the same few hundred dates across many rows, so each distinct
+    value is parsed once and the result is broadcast back through factorize codes.
+    """
+    if ser is None or len(ser) == 0:
+        return pd.to_datetime(ser, errors="coerce")
+    if pd.api.types.is_datetime64_any_dtype(ser):
+        return ser
+
+    codes, uniques = pd.factorize(ser)
+    keys = [(type(u), u) for u in uniques]
+    # Results are read from this call's own mapping, so another session clearing the shared
+    # cache between the lookup and the broadcast cannot drop an entry we still need.
+    with _PARSED_DATE_CACHE_LOCK:
+        known = {k: _PARSED_DATE_CACHE[k] for k in keys if k in _PARSED_DATE_CACHE}
+    todo = [i for i, k in enumerate(keys) if k not in known]
+    if todo:
+        fresh = dict(zip(
+            (keys[i] for i in todo),
+            _parse_formats(pd.Series([uniques[i] for i in todo], dtype=object)).to_numpy(),
+        ))
+        known.update(fresh)
+        with _PARSED_DATE_CACHE_LOCK:
+            if len(_PARSED_DATE_CACHE) + len(fresh) > _MAX_CACHED_DATES:
+                _PARSED_DATE_CACHE.clear()
+            _PARSED_DATE_CACHE.update(fresh)
+    parsed = np.array([known[k] for k in keys] + [np.datetime64("NaT", "ns")], dtype="datetime64[ns]")
+    values = parsed[codes]
+    return pd.Series(values, index=ser.index, name=ser.name)
@@ -3,8 +3,46 @@ FileUploadAgent - Handles CSV/Excel file uploads
 Responsibility: Read and validate uploaded files
 """
 
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import pandas as pd
-from typing import Optional, Tuple
+from typing import Optional, Sequence, Tuple
+
+# Rust-based Excel reader (pandas >= 2.2); much faster than openpyxl on large workbooks
+try:
+    import python_calamine  # noqa: F401
+    _EXCEL_ENGINE: Optional[str] = "calamine"
+except ImportError:
+    _EXCEL_ENGINE = None
+
+# Parsed uploads kept in memory, keyed by file content; Streamlit re-runs the upload
+# step on every widget interaction, so the same bytes are otherwise re-parsed each time.
+# Module-level so every orchestrator / session in the process shares one cache.
+_MAX_CACHED_UPLOADS = 4
+_UPLOAD_CACHE: "OrderedDict[tuple, pd.DataFrame]" = OrderedDict()
+_UPLOAD_CACHE_LOCK = threading.Lock()
+
+# Text columns with fewer distinct values than this share of rows are stored as category
+_CATEGORY_MAX_RATIO = 0.5
+
+
+def _cache_get(key: tuple) -> Optional[pd.DataFrame]:
+    with _UPLOAD_CACHE_LOCK:
+        df = _UPLOAD_CACHE.get(key)
+        if df is not None:
+            _UPLOAD_CACHE.move_to_end(key)
+        return df
+
+
+def _cache_put(key: tuple, df: pd.DataFrame) -> None:
+    with _UPLOAD_CACHE_LOCK:
+        _UPLOAD_CACHE[key] = df
+        _UPLOAD_CACHE.move_to_end(key)
+        while len(_UPLOAD_CACHE) > _MAX_CACHED_UPLOADS:
+            _UPLOAD_CACHE.popitem(last=False)
 
 
 class FileUploadAgent:
@@ -21,13 +59,74 @@ class FileUploadAgent:
     def __init__(self):
         self.name = "FileUploadAgent"
         self.supported_formats = ['.csv', '.xlsx', '.xls']
+
+    @staticmethod
+    def _content_digest(uploaded_file) -> str:
+        """
+        sha256 of the file content. In-memory uploads (Streamlit UploadedFile / BytesIO) are
+        hashed through a zero-copy buffer view; other sources are streamed in chunks.
+        """
+        if hasattr(uploaded_file, 'getbuffer'):
+            with uploaded_file.getbuffer() as view:
+                return hashlib.sha256(view).hexdigest()
+        digest = hashlib.sha256()
+        if hasattr(uploaded_file, 'read'):
+            uploaded_file.seek(0)
+            for chunk in iter(lambda: uploaded_file.read(1 << 20), b''):
+                digest.update(chunk)
+            uploaded_file.seek(0)
+            return digest.hexdigest()
+        with open(uploaded_file, 'rb') as fh:
+            for chunk in iter(lambda: fh.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
     
-    def process(self, uploaded_file) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
+    @staticmethod
+    def _read_excel(uploaded_file, usecols) -> pd.DataFrame:
+        """read_excel with calamine when installed; falls back to the default engine."""
+        if _EXCEL_ENGINE:
+            try:
+                return pd.read_excel(uploaded_file, usecols=usecols, engine=_EXCEL_ENGINE)
+            except Exception:
+                # Older pandas without calamine support, or a workbook calamine rejects
+                if hasattr(uploaded_file, 'seek'):
+                    uploaded_file.seek(0)
+        return pd.read_excel(uploaded_file, usecols=usecols)
+
+    @staticmethod
+    def _shrink(df: pd.DataFrame, int2uint: bool = True) -> pd.DataFrame:
+        """
+        Smallest fitting dtypes for a freshly read frame (modifies and returns ``df``).
+
+        Integer columns are downcast (unsigned when ``int2uint`` and no value is negative);
+        text columns that repeat a few labels (Employee Type, Filled, School Year, ...) become
+        category so later isin / masks / groupbys work on small integer codes. Float columns
+        stay float64: Duration and day counts feed premium sums, and float32 would round them.
+        """
+        n_rows = len(df)
+        for i, col in enumerate(df.columns):
+            s = df.iloc[:, i]
+            if pd.api.types.is_integer_dtype(s.dtype) and not pd.api.types.is_bool_dtype(s.dtype):
+                if int2uint and (s.empty or s.min() >= 0):
+                    # Unsigned ladder; values beyond uint32 keep their 64-bit dtype
+                    target = next((t for t in (np.uint8, np.uint16, np.uint32) if s.empty or s.max() <= np.iinfo(t).max), None)
+                else:
+                    target = next((t for t in (np.int8, np.int16, np.int32)
+                                   if s.min() >= np.iinfo(t).min and s.max() <= np.iinfo(t).max), None)
+                if target is not None and s.dtype != target:
+                    df.isetitem(i, s.astype(target))
+            elif s.dtype == object and n_rows and s.nunique() / n_rows < _CATEGORY_MAX_RATIO:
+                df.isetitem(i, s.astype('category'))
+        return df
+    
+    def process(self, uploaded_file, usecols: Optional[Sequence[str]] = None) -> Tuple[Optional[pd.DataFrame], Optional[str]]:
         """
         Process uploaded file and return DataFrame.
         
         Args:
             uploaded_file: Streamlit UploadedFile object or file path
+            usecols: Optional column names to read; other columns are skipped by the parser.
+                None reads every column (needed for the Step 2 column picker).
             
         Returns:
             Tuple of (DataFrame, error_message)
@@ -43,11 +142,22 @@ class FileUploadAgent:
             if file_ext not in ['csv', 'xlsx', 'xls']:
                 return None, f"Unsupported file format: .{file_ext}. Supported: .csv, .xlsx, .xls"
             
-            # Read file based on extension
+            # Same content already parsed (Streamlit rerun): skip the read entirely
+            wanted = frozenset(usecols) if usecols else None
+            cache_key = (file_ext, self._content_digest(uploaded_file), wanted)
+            cached = _cache_get(cache_key)
+            if cached is not None:
+                return cached, None
+
+            # Read file based on extension (callable usecols ignores names absent from the file)
+            # The parser reads the upload itself (rewound), not a second in-memory copy
+            read_cols = (lambda c: c in wanted) if wanted else None
+            if hasattr(uploaded_file, 'seek'):
+                uploaded_file.seek(0)
             if file_ext == 'csv':
-                df = pd.read_csv(uploaded_file)
+                df = pd.read_csv(uploaded_file, usecols=read_cols)
             else:  # xlsx or xls
-                df = pd.read_excel(uploaded_file)
+                df = self._read_excel(uploaded_file, read_cols)
             
             # Basic validation
             if df.empty:
@@ -55,8 +165,13 @@ class FileUploadAgent:
 
             # Deduplicate columns (Excel/CSV can have duplicate headers) to avoid
             # "cannot assemble with duplicate keys" in downstream filter/date ops
-            if df.columns.duplicated().any():
-                df = df.loc[:, ~df.columns.duplicated()]
+            if not df.columns.is_unique:
+                df = df.take(np.flatnonzero(~df.columns.duplicated()), axis=1)
+
+            # The cached frame is the shrunk one, so reruns reuse the small dtypes too
+            df = self._shrink(df)
+
+            _cache_put(cache_key, df)
 
             return df, None
             
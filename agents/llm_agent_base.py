@@ -4,7 +4,11 @@ Includes observability (prompt/response/tokens/timing) and error recovery (retri
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Dict, Any, Optional, Tuple
+import json
+import threading
 import time
 import logging
 
@@ -31,9 +35,60 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Environment read once at import (after .env is loaded) instead of on every agent / call
+_OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+_ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
+_GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+_AWS_REGION = (os.getenv("AWS_REGION") or "").strip() or "us-east-1"
+_LLM_FALLBACK_PROVIDER = (os.getenv("LLM_FALLBACK_PROVIDER") or "").strip().lower()
+_LLM_MODEL = os.getenv("LLM_MODEL")
+_LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+_LLM_RETRY_DELAY = float(os.getenv("LLM_RETRY_DELAY", "1.0"))
+
 # Observability: log LLM calls (prompt length, response length, duration, token usage if available)
 _LLM_LOGGER = logging.getLogger("abcover.llm")
 
+# Responses to identical prompts, so a Streamlit rerun that re-asks the same question
+# (same agent, provider, model, system prompt and message) returns instantly. Only replies the
+# caller accepts are stored (see _call_llm's cache_if). Bounded LRU, shared process-wide like
+# the upload cache.
+_MAX_CACHED_RESPONSES = 256
+_RESPONSE_CACHE: "OrderedDict[Tuple[str, str, str, str, str], str]" = OrderedDict()
+_RESPONSE_CACHE_LOCK = threading.Lock()
+
+
+def is_json_object(text: str, code_fence: bool = False) -> bool:
+    """
+    True when an LLM reply parses to a JSON object. With code_fence=True a reply wrapped in a
+    markdown ``` block is unwrapped first (the callers that strip fences themselves pass it).
+    """
+    text = text.strip()
+    if code_fence and "```" in text:
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        if start >= 0 and end > start:
+            text = text[start:end]
+    try:
+        return isinstance(json.loads(text), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+@lru_cache(maxsize=8)
+def _build_llm(provider: str, kwargs: Tuple[Tuple[str, Any], ...]) -> Any:
+    """
+    Construct the LangChain chat model for a provider ("openai", "anthropic", "google", "bedrock").
+    Memoized on the full settings, so every agent (and every Streamlit rerun) asking for the same
+    model reuses one client instead of re-creating it and its HTTP session.
+    """
+    chat_cls = {
+        "openai": ChatOpenAI,
+        "anthropic": ChatAnthropic,
+        "google": ChatGoogleGenerativeAI,
+        "bedrock": ChatBedrockConverse,
+    }[provider]
+    return chat_cls(**dict(kwargs))
+
 
 class LLMAgentBase(ABC):
     """
@@ -52,31 +107,48 @@ class LLMAgentBase(ABC):
         """
         self.agent_name = agent_name
         self.model_provider = model_provider
-        self.llm = self._initialize_llm(model_name)
+        # Settings are resolved (and missing keys reported) now; the client is built on first use
+        self._llm_settings = self._llm_config(model_name)
+        self.model_name = dict(self._llm_settings[1])["model"]
+        self._llm: Optional[Any] = None
         self.system_prompt = self._get_system_prompt()
-    
-    def _initialize_llm(self, model_name: Optional[str]) -> Any:
-        """Initialize the LLM based on provider."""
+
+    @property
+    def llm(self) -> Any:
+        """Chat model client, created on first call and shared by agents with the same settings."""
+        if self._llm is None:
+            self._llm = _build_llm(*self._llm_settings)
+        return self._llm
+
+    @llm.setter
+    def llm(self, value: Any) -> None:
+        self._llm = value
+
+    def _llm_config(self, model_name: Optional[str]) -> Tuple[str, Tuple[Tuple[str, Any], ...]]:
+        """
+        Provider and constructor arguments for the chat model, as a hashable pair for _build_llm.
+        Raises ValueError for an unknown provider or a missing API key.
+        """
         if self.model_provider == "openai":
-            api_key = os.getenv("OPENAI_API_KEY")
+            api_key = _OPENAI_API_KEY
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found in environment variables")
-            return ChatOpenAI(
-                model=model_name or "gpt-4-turbo-preview",
-                temperature=0.3,  # Lower temperature for more consistent reasoning
-                api_key=api_key
+            return "openai", (
+                ("model", model_name or "gpt-4-turbo-preview"),
+                ("temperature", 0.3),  # Lower temperature for more consistent reasoning
+                ("api_key", api_key),
             )
         elif self.model_provider == "anthropic":
-            api_key = os.getenv("ANTHROPIC_API_KEY")
+            api_key = _ANTHROPIC_API_KEY
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY not found in environment variables")
-            return ChatAnthropic(
-                model=model_name or "claude-3-opus-20240229",
-                temperature=0.3,
-                api_key=api_key
+            return "anthropic", (
+                ("model", model_name or "claude-3-opus-20240229"),
+                ("temperature", 0.3),
+                ("api_key", api_key),
             )
         elif self.model_provider == "google" or self.model_provider == "gemini":
-            api_key = os.getenv("GOOGLE_API_KEY")
+            api_key = _GOOGLE_API_KEY
             if not api_key:
                 raise ValueError(
                     "GOOGLE_API_KEY not found in environment variables.\n"
@@ -86,23 +158,23 @@ class LLMAgentBase(ABC):
                     "3. Click 'Create API Key'\n"
                     "4. Copy the key and add to .env file: GOOGLE_API_KEY=your_key_here"
                 )
-            return ChatGoogleGenerativeAI(
-                model=model_name or "gemini-2.5-flash",  # Verified working model (free, fast)
-                temperature=0.3,
-                google_api_key=api_key
+            return "google", (
+                ("model", model_name or "gemini-2.5-flash"),  # Verified working model (free, fast)
+                ("temperature", 0.3),
+                ("google_api_key", api_key),
             )
         elif self.model_provider == "bedrock":
             if ChatBedrockConverse is None:
                 raise ValueError(
                     "langchain-aws is required for Bedrock. Install with: pip install langchain-aws"
                 )
-            region = (os.getenv("AWS_REGION") or "").strip() or "us-east-1"
+            region = _AWS_REGION
             # Use inference profile ID (us.*) for on-demand; raw model ID causes ValidationException
             model_id = model_name or "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
-            return ChatBedrockConverse(
-                model=model_id,
-                temperature=0.3,
-                region_name=region,
+            return "bedrock", (
+                ("model", model_id),
+                ("temperature", 0.3),
+                ("region_name", region),
             )
         else:
             raise ValueError(
@@ -115,35 +187,83 @@ class LLMAgentBase(ABC):
         """Return the system prompt for this agent."""
         pass
     
+    def _system_message(self) -> SystemMessage:
+        """
+        System prompt as a message. The prompt is a static prefix on every call, so for Anthropic it is
+        marked as a prompt-cache breakpoint (later calls bill the cached prefix at the reduced rate).
+        OpenAI caches long prefixes automatically; Gemini context caching needs far larger prompts.
+        Built once and reused while system_prompt is the same object.
+        """
+        cached = getattr(self, "_system_message_cache", None)
+        if cached is not None and cached[0] is self.system_prompt:
+            return cached[1]
+        if self.model_provider == "anthropic":
+            message = SystemMessage(content=[
+                {"type": "text", "text": self.system_prompt, "cache_control": {"type": "ephemeral"}}
+            ])
+        else:
+            message = SystemMessage(content=self.system_prompt)
+        self._system_message_cache = (self.system_prompt, message)
+        return message
+    
     def _get_fallback_llm(self) -> Optional[Any]:
         """Optional fallback LLM (e.g. Google) if primary fails. Override or set via env."""
-        fallback_provider = (os.getenv("LLM_FALLBACK_PROVIDER") or "").strip().lower()
+        fallback_provider = _LLM_FALLBACK_PROVIDER
         if not fallback_provider or fallback_provider == self.model_provider:
             return None
         try:
             if fallback_provider == "google" or fallback_provider == "gemini":
-                api_key = os.getenv("GOOGLE_API_KEY")
+                api_key = _GOOGLE_API_KEY
                 if api_key:
-                    return ChatGoogleGenerativeAI(
-                        model=os.getenv("LLM_MODEL") or "gemini-2.5-flash",
-                        temperature=0.3,
-                        google_api_key=api_key,
-                    )
+                    return _build_llm("google", (
+                        ("model", _LLM_MODEL or "gemini-2.5-flash"),
+                        ("temperature", 0.3),
+                        ("google_api_key", api_key),
+                    ))
         except Exception:
             pass
         return None
 
-    def _call_llm(self, user_message: str, context: Optional[Dict] = None) -> str:
+    def _call_llm(
+        self,
+        user_message: str,
+        context: Optional[Dict] = None,
+        cache_if: Optional[Callable[[str], bool]] = None,
+    ) -> str:
         """
         Call the LLM with retries, optional fallback, and observability logging.
         Logs: agent name, prompt length, response length, duration, token usage (if available).
+        Caching is opt-in: with ``cache_if``, a repeat of an earlier call returns the cached response,
+        and a fresh response is stored only when ``cache_if(response)`` accepts it (so an unparseable
+        reply is asked again next time). Calls with a ``context`` always go out.
         """
+        if context is not None or cache_if is None:
+            return self._invoke_llm(user_message)
+        key = (self.agent_name, self.model_provider, self.model_name, self.system_prompt, user_message)
+        with _RESPONSE_CACHE_LOCK:
+            content = _RESPONSE_CACHE.get(key)
+            if content is not None:
+                _RESPONSE_CACHE.move_to_end(key)
+        if content is not None:
+            _LLM_LOGGER.info("llm_call cached agent=%s provider=%s", self.agent_name, self.model_provider)
+            return content
+        content = self._invoke_llm(user_message)
+        if not cache_if(content):
+            return content
+        with _RESPONSE_CACHE_LOCK:
+            _RESPONSE_CACHE[key] = content
+            _RESPONSE_CACHE.move_to_end(key)
+            while len(_RESPONSE_CACHE) > _MAX_CACHED_RESPONSES:
+                _RESPONSE_CACHE.popitem(last=False)
+        return content
+
+    def _invoke_llm(self, user_message: str) -> str:
+        """One uncached LLM call: retries with backoff, then the fallback model if configured."""
         messages = [
-            SystemMessage(content=self.system_prompt),
+            self._system_message(),
             HumanMessage(content=user_message),
         ]
-        max_retries = int(os.getenv("LLM_MAX_RETRIES", "3"))
-        retry_delay = float(os.getenv("LLM_RETRY_DELAY", "1.0"))
+        max_retries, retry_delay = _LLM_MAX_RETRIES, _LLM_RETRY_DELAY
 
         last_error = None
         for attempt in range(max_retries):
@@ -191,7 +311,8 @@ class LLMAgentBase(ABC):
         if fallback is not None:
             try:
                 start = time.perf_counter()
-                response = fallback.invoke(messages)
+                # Plain-text system prompt: cache markers are provider-specific
+                response = fallback.invoke([SystemMessage(content=self.system_prompt), messages[1]])
                 duration_sec = time.perf_counter() - start
                 content = response.content if hasattr(response, "content") else str(response)
                 _LLM_LOGGER.info(
@@ -4,8 +4,10 @@ Uses LangGraph for state management and agent coordination
 """
 
 import os
-from typing import TypedDict, Annotated, Any
+from functools import lru_cache
+from typing import TypedDict, Annotated, Any, Optional, Tuple
 from langgraph.graph import StateGraph, END
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 from .blackboard import Blackboard
@@ -13,19 +15,11 @@ from .file_upload_agent import FileUploadAgent
 from .data_selection_agent import DataSelectionAgent
 from .data_cleaning_agent_llm import DataCleaningAgentLLM
 from .rating_engine_agent_llm import RatingEngineAgentLLM
-from .date_parsing import parse_absence_date_series
+from .school_year import school_year_from_dates
 
 load_dotenv()
 
 
-def _parse_date_series_fast(ser: pd.Series) -> pd.Series:
-    """
-    Parse absence Date column when the same file mixes ISO and US-style strings
-    (e.g. JPS MASTER.csv). Only use for the real absence 'Date' column.
-    """
-    return parse_absence_date_series(ser)
-
-
 class AgentState(TypedDict, total=False):
     """
     State managed by LangGraph (like blackboard).
@@ -51,6 +45,7 @@ class AgentState(TypedDict, total=False):
     # Metadata
     school_name: str
     selected_columns: list
+    upload_columns: list  # optional: restrict the file read to these columns (run() only)
     column_map: dict  # optional: { original_column_name: standard_name }
     filters: dict
     rating_inputs: dict
@@ -59,17 +54,23 @@ class AgentState(TypedDict, total=False):
     processing_history: Annotated[list, lambda x, y: x + y]  # Append-only list
 
 
+def _llm_settings_from_env() -> Tuple[str, Optional[str]]:
+    provider = (os.getenv("LLM_PROVIDER") or "google").strip().lower()
+    model_name = (os.getenv("LLM_MODEL") or "").strip() or None
+    return provider, model_name
+
+
 class LangGraphOrchestrator:
     """
     Orchestrates agents using LangGraph with state management (blackboard pattern).
     """
     
-    def __init__(self):
-        """Initialize orchestrator and agents. LLM provider/model from env: LLM_PROVIDER, LLM_MODEL."""
+    def __init__(self, provider: Optional[str] = None, model_name: Optional[str] = None):
+        """Initialize orchestrator and agents. LLM provider/model default to env: LLM_PROVIDER, LLM_MODEL."""
         self.upload_agent = FileUploadAgent()
         self.selection_agent = DataSelectionAgent()
-        provider = (os.getenv("LLM_PROVIDER") or "google").strip().lower()
-        model_name = (os.getenv("LLM_MODEL") or "").strip() or None
+        if provider is None:
+            provider, model_name = _llm_settings_from_env()
         self.cleaning_agent = DataCleaningAgentLLM(model_provider=provider, model_name=model_name)
         self.rating_agent = RatingEngineAgentLLM(model_provider=provider, model_name=model_name)
         
@@ -102,7 +103,9 @@ class LangGraphOrchestrator:
         uploaded_file = state.get("uploaded_file")
         
         if uploaded_file:
-            df, error = self.upload_agent.process(uploaded_file)
+            # Full workflow run knows the selected columns up front; read only those.
+            # Interactive uploads (no upload_columns) need every column for Step 2.
+            df, error = self.upload_agent.process(uploaded_file, usecols=state.get("upload_columns"))
             if error:
                 raise ValueError(f"Upload error: {error}")
             
@@ -124,7 +127,9 @@ class LangGraphOrchestrator:
             cols = [c for c in selected_columns if c in df.columns]
             if not cols:
                 raise ValueError("No selected columns found in data.")
-            df = df[cols].copy()
+            # One owned copy of the selected columns (df[cols] would be flagged as a copy of raw_data,
+            # and the School Year / rename steps below write to it)
+            df = df.take(df.columns.get_indexer_for(cols), axis=1)
             # Apply column mapping (rename to standard names; derive School Year only from real "Date" column)
             # Strictly only the absence "Date" column is used for date parsing; not Hire Date or other date columns.
             if column_map:
@@ -137,9 +142,7 @@ class LangGraphOrchestrator:
                         if orig_normalized == "date":
                             # Only derive School Year from the real absence Date column (fast parse)
                             try:
-                                dates = _parse_date_series_fast(df[orig])
-                                year_start = dates.dt.year.where(dates.dt.month >= 7, dates.dt.year - 1)
-                                df["School Year"] = year_start.astype(str) + "-" + (year_start + 1).astype(str)
+                                df["School Year"] = school_year_from_dates(df[orig])
                                 df = df.drop(columns=[orig], errors="ignore")
                             except Exception:
                                 rename_map[orig] = standard
@@ -150,8 +153,8 @@ class LangGraphOrchestrator:
                         rename_map[orig] = standard
                 df = df.rename(columns={k: v for k, v in rename_map.items() if k in df.columns})
             # Deduplicate columns after rename (multiple originals can map to same standard name)
-            if df.columns.duplicated().any():
-                df = df.loc[:, ~df.columns.duplicated()]
+            if not df.columns.is_unique:
+                df = df.take(np.flatnonzero(~df.columns.duplicated()), axis=1)
             df_selected, error = self.selection_agent.process(df, df.columns.tolist(), filters)
             if error:
                 raise ValueError(f"Selection error: {error}")
@@ -245,27 +248,25 @@ class LangGraphOrchestrator:
     }
 
     def _normalize_calc_columns(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Rename columns to standard names if they match known aliases. Returns a copy."""
+        """Rename columns to standard names if they match known aliases. Returns a new frame sharing df's data (df itself when nothing matches)."""
         if df is None or df.empty:
             return df
+        # Alias lookup over the whole header at once: exact lowercased name first, then with spaces removed
+        keys = df.columns.astype(str).str.strip().str.lower()
+        aliases = self._COLUMN_ALIASES
+        targets = keys.map(lambda k: aliases.get(k) or aliases.get(k.replace(' ', '')))
+        has_days = 'Absence_Days' in df.columns
         col_map = {}
-        for c in df.columns:
-            c_str = str(c).strip()
-            target = None
-            if c_str.lower() in self._COLUMN_ALIASES:
-                target = self._COLUMN_ALIASES[c_str.lower()]
-            else:
-                key_no_space = c_str.lower().replace(' ', '')
-                if key_no_space in self._COLUMN_ALIASES:
-                    target = self._COLUMN_ALIASES[key_no_space]
+        for c, key, target in zip(df.columns, keys, targets):
             # IMPORTANT: Do NOT map Duration -> Absence_Days when Absence_Days already exists.
             # Duration is HOURS (e.g. 7.5); Absence_Days from cleaning is correct DAYS (1.0, 0.5).
-            if target == 'Absence_Days' and 'Absence_Days' in df.columns and c_str.lower() in ('duration',):
+            if target == 'Absence_Days' and has_days and key == 'duration':
                 continue  # Skip - would wrongly add hours as days
             if target:
                 col_map[c] = target
         if col_map:
-            df = df.rename(columns=col_map)
+            # Labels only: the column data is not copied (callers copy before writing columns)
+            df = df.rename(columns=col_map, copy=False)
         return df
 
     @staticmethod
@@ -276,12 +277,8 @@ class LangGraphOrchestrator:
         if 'Date' not in df.columns:
             return df
         try:
-            dates = _parse_date_series_fast(df['Date'])
-            # July 1+ -> current year start; before July -> previous year start
-            year_start = dates.dt.year.where(dates.dt.month >= 7, dates.dt.year - 1)
-            year_end = year_start + 1
-            df = df.copy()
-            df['School Year'] = year_start.astype(str) + '-' + year_end.astype(str)
+            school_year = school_year_from_dates(df['Date'])
+            df = df.assign(**{'School Year': school_year})
         except Exception:
             pass
         return df
@@ -294,7 +291,7 @@ class LangGraphOrchestrator:
         
         if df is not None and not df.empty and rating_inputs:
             # Normalize column names so 'School Year', 'Employee Identifier', 'Absence_Days' exist
-            df = self._normalize_calc_columns(df.copy())
+            df = self._normalize_calc_columns(df)
             # If still no School Year but we have Date, derive it (July 1 - June 30)
             df = self._derive_school_year_from_date(df)
             missing = [c for c in self._REQUIRED_CALC_COLUMNS if c not in df.columns]
@@ -312,24 +309,22 @@ class LangGraphOrchestrator:
                     f"Cleaned data is missing columns required for the rating calculation: {missing}. "
                     f"Your data has columns: {available}. {hint}"
                 )
-            # Keep full cleaned data for rating (so first/last name and other columns are available for detail tables)
-            cleaned_data_full = df.copy()
-            # Handle duplicate columns (multiple cols can map to same standard name)
-            # Build a clean 3-column df for teacher_days aggregation only
-            def _single_col(d, name, combine_sum=False):
-                cols = [i for i, c in enumerate(d.columns) if c == name]
-                if not cols:
-                    return None
-                if combine_sum and len(cols) > 1:
-                    return d.iloc[:, cols].sum(axis=1)
-                return d.iloc[:, cols[0]]
-            df_calc = pd.DataFrame({
-                'School Year': _single_col(df, 'School Year'),
-                'Employee Identifier': _single_col(df, 'Employee Identifier'),
-                'Absence_Days': _single_col(df, 'Absence_Days', combine_sum=True),
-            })
+            # Keep full cleaned data for rating (so first/last name and other columns are available for detail tables);
+            # the rating agent only reads it, so no copy is taken
+            cleaned_data_full = df
+            # Handle duplicate columns (multiple cols can map to same standard name): the first
+            # School Year / Employee Identifier column is used and Absence_Days columns are summed.
+            # The three columns are grouped directly as Series (no intermediate 3-column frame).
+            columns = df.columns
+            school_year = df.iloc[:, columns.get_indexer_for(['School Year'])[0]]
+            employee_id = df.iloc[:, columns.get_indexer_for(['Employee Identifier'])[0]]
+            day_positions = columns.get_indexer_for(['Absence_Days'])
+            if len(day_positions) > 1:
+                absence_days = df.iloc[:, day_positions].sum(axis=1).rename('Absence_Days')
+            else:
+                absence_days = df.iloc[:, day_positions[0]]
             # Calculate teacher absence days first
-            teacher_days = df_calc.groupby(['School Year', 'Employee Identifier'])['Absence_Days'].sum().reset_index()
+            teacher_days = absence_days.groupby([school_year, employee_id], observed=True).sum().reset_index()
             # Only assign names if count matches (avoids length mismatch with duplicate cols)
             if len(teacher_days.columns) == 3:
                 teacher_days.columns = ['School Year', 'Employee Identifier', 'Total_Days']
@@ -399,6 +394,7 @@ class LangGraphOrchestrator:
         initial_state: AgentState = {
             "uploaded_file": uploaded_file,
             "selected_columns": selected_columns or [],
+            "upload_columns": selected_columns or None,
             "filters": filters or {},
             "school_name": school_name or "",
             "rating_inputs": rating_inputs or {},
@@ -416,3 +412,18 @@ class LangGraphOrchestrator:
         # Run graph
         final_state = self.graph.invoke(initial_state)
         return final_state
+
+
+@lru_cache(maxsize=4)
+def _cached_orchestrator(provider: str, model_name: Optional[str]) -> LangGraphOrchestrator:
+    return LangGraphOrchestrator(provider, model_name)
+
+
+def get_orchestrator() -> LangGraphOrchestrator:
+    """
+    Shared orchestrator for the configured LLM provider/model (LLM_PROVIDER, LLM_MODEL).
+    Agents and the compiled graph hold no per-run state, so one instance serves every Streamlit
+    session and rerun instead of re-creating agents and recompiling the graph each time.
+    Construction errors (e.g. a missing API key) are not cached.
+    """
+    return _cached_orchestrator(*_llm_settings_from_env())
@@ -8,9 +8,10 @@ counts, distributions) are done in pandas; we send only aggregated statistics
 token size small, latency low, and cost down.
 """
 
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, Optional, Tuple
-from .llm_agent_base import LLMAgentBase
+from .llm_agent_base import LLMAgentBase, is_json_object
 import json
 
 
@@ -179,13 +180,11 @@ Rating Engine Calculation Logic (from Excel Template):
         max_days = teacher_days['Total_Days'].max()
         cc_maximum = deductible + cc_days
         
-        # Teachers in different ranges
-        below_deductible = len(teacher_days[teacher_days['Total_Days'] <= deductible])
-        in_cc_range = len(teacher_days[
-            (teacher_days['Total_Days'] > deductible) & 
-            (teacher_days['Total_Days'] <= cc_maximum)
-        ])
-        high_claimant = len(teacher_days[teacher_days['Total_Days'] > cc_maximum])
+        # Teachers in different ranges (counted on the raw array; no filtered frames)
+        days = teacher_days['Total_Days'].to_numpy(dtype=float)
+        below_deductible = int(np.count_nonzero(days <= deductible))
+        in_cc_range = int(np.count_nonzero((days > deductible) & (days <= cc_maximum)))
+        high_claimant = int(np.count_nonzero(days > cc_maximum))
         
         # Add blackboard context if available
         context_info = ""
@@ -248,7 +247,7 @@ Note: Calculation approach is FIXED based on Excel template:
 - Excess Days: Always count only excess beyond CC Maximum (excess_only)
 """
         
-        llm_response = self._call_llm(prompt)
+        llm_response = self._call_llm(prompt, cache_if=is_json_object)
         
         try:
             reasoning = json.loads(llm_response)
@@ -361,23 +360,22 @@ Note: Calculation approach is FIXED based on Excel template:
             'Absence_Days': _single_col(cleaned_data, 'Absence_Days', combine_sum=True),
         })
         cleaned_metrics_df['Absence_Days'] = pd.to_numeric(cleaned_metrics_df['Absence_Days'], errors='coerce').fillna(0.0)
+        # Hash the (object) IDs once; staff counts below then work on the integer category codes
+        emp_codes, emp_uniques = pd.factorize(cleaned_metrics_df['Employee Identifier'])
+        cleaned_metrics_df['Employee Identifier'] = pd.Categorical.from_codes(emp_codes, categories=emp_uniques)
 
         per_school_year_metrics = {}
         
         if 'School Year' in cleaned_metrics_df.columns:
-            # Group by School Year
-            for school_year in cleaned_metrics_df['School Year'].unique():
-                if pd.isna(school_year):
-                    continue
-                    
-                sy_data = cleaned_metrics_df[cleaned_metrics_df['School Year'] == school_year]
-                
-                # Total # Of Staff (unique Employee Identifiers per school year)
-                total_staff = sy_data['Employee Identifier'].nunique() if 'Employee Identifier' in sy_data.columns else 0
-                
-                # Total # of Absences = sum of actual days (Absence_Days), not row count
-                total_absences = _safe_numeric_sum(sy_data['Absence_Days']) if 'Absence_Days' in sy_data.columns else float(len(sy_data))
-                
+            # One groupby pass instead of a boolean-mask scan per school year
+            by_year = cleaned_metrics_df.groupby('School Year', sort=False, observed=True)
+            # Total # Of Staff (unique Employee Identifiers per school year)
+            staff_per_year = by_year['Employee Identifier'].nunique()
+            # Total # of Absences = sum of actual days (Absence_Days), not row count
+            absences_per_year = by_year['Absence_Days'].sum()
+            
+            for school_year, total_staff in staff_per_year.items():
+                total_absences = float(absences_per_year[school_year])
                 # Total Replacement Cost to District (Total Absence Days × Replacement Cost Per Day)
                 total_replacement_cost = total_absences * replacement_cost
                 
@@ -388,7 +386,7 @@ Note: Calculation approach is FIXED based on Excel template:
                 }
         
         # Calculate overall totals (across all school years) - use actual days, not row count
-        overall_total_staff = cleaned_metrics_df['Employee Identifier'].nunique() if 'Employee Identifier' in cleaned_metrics_df.columns else 0
+        overall_total_staff = len(emp_uniques)
         overall_total_absences = _safe_numeric_sum(cleaned_metrics_df['Absence_Days']) if 'Absence_Days' in cleaned_metrics_df.columns else float(len(cleaned_metrics_df))
         overall_total_replacement_cost = overall_total_absences * replacement_cost
         
@@ -422,15 +420,21 @@ Note: Calculation approach is FIXED based on Excel template:
                         last_name_col = c
                         break
             if first_name_col is not None or last_name_col is not None:
-                def _str_val(val):
-                    return '' if pd.isna(val) else str(val).strip()
                 first_row_per_emp = cleaned_data.drop_duplicates(subset=['Employee Identifier'], keep='first')
-                for _, row in first_row_per_emp.iterrows():
-                    eid = row['Employee Identifier']
-                    emp_name_lookup[eid] = (
-                        _str_val(row.get(first_name_col, '')) if first_name_col else '',
-                        _str_val(row.get(last_name_col, '')) if last_name_col else ''
-                    )
+
+                def _str_col(col) -> pd.Series:
+                    """Whole-column str/strip (missing -> ''); first column wins on duplicate names."""
+                    if col is None:
+                        return pd.Series('', index=first_row_per_emp.index)
+                    vals = first_row_per_emp[col]
+                    if isinstance(vals, pd.DataFrame):
+                        vals = vals.iloc[:, 0]
+                    return vals.astype(str).str.strip().where(vals.notna(), '')
+
+                emp_name_lookup = dict(zip(
+                    first_row_per_emp['Employee Identifier'],
+                    zip(_str_col(first_name_col), _str_col(last_name_col)),
+                ))
         
         def _emp_names(emp_id):
             first, last = emp_name_lookup.get(emp_id, ('', ''))
@@ -438,7 +442,7 @@ Note: Calculation approach is FIXED based on Excel template:
         
         # Perform calculations based on recommended approach
         cc_maximum = deductible + cc_days
-        total_days_per_teacher = teacher_days.groupby('Employee Identifier')['Total_Days'].sum()
+        total_days_per_teacher = teacher_days.groupby('Employee Identifier', observed=True)['Total_Days'].sum()
         
         # Staff in CC Range
         staff_in_cc_range = total_days_per_teacher[
@@ -449,22 +453,20 @@ Note: Calculation approach is FIXED based on Excel template:
         
         # Total CC Days: Count ONLY days in CC range (Greater than Deductible BUT ≤ CC Maximum)
         # Formula: For each teacher, count (Total_Days - Deductible) but cap at (CC Maximum - Deductible)
-        total_cc_days = 0
+        cc_band = cc_maximum - deductible
+        cc_days_in_range = np.minimum(staff_in_cc_range.to_numpy() - deductible, cc_band)
+        total_cc_days = float(cc_days_in_range.sum())
         cc_range_details = []  # For debugging/validation
-        for emp_id, days in staff_in_cc_range.items():
-            if days > deductible:
-                # Count days in CC range: (days - deductible), but max is (cc_maximum - deductible)
-                days_in_range = min(days - deductible, cc_maximum - deductible)
-                first_name, last_name = _emp_names(emp_id)
-                cc_range_details.append({
-                    'employee_id': emp_id,
-                    'employee_first_name': first_name,
-                    'employee_last_name': last_name,
-                    'total_days': days,
-                    'days_in_cc_range': days_in_range,
-                    'calculation': f"min({days} - {deductible}, {cc_maximum} - {deductible}) = {days_in_range}"
-                })
-                total_cc_days += days_in_range
+        for emp_id, days, days_in_range in zip(staff_in_cc_range.index, staff_in_cc_range.to_numpy(), cc_days_in_range):
+            first_name, last_name = _emp_names(emp_id)
+            cc_range_details.append({
+                'employee_id': emp_id,
+                'employee_first_name': first_name,
+                'employee_last_name': last_name,
+                'total_days': days,
+                'days_in_cc_range': days_in_range,
+                'calculation': f"min({days} - {deductible}, {cc_maximum} - {deductible}) = {days_in_range}"
+            })
         
         # Replacement Cost × CC Days
         replacement_cost_cc = replacement_cost * total_cc_days
@@ -516,36 +518,53 @@ Note: Calculation approach is FIXED based on Excel template:
         # ============================================================================
         per_school_year_breakdown = {}
         if 'School Year' in teacher_days.columns:
-            for sy in teacher_days['School Year'].dropna().unique():
-                sy_str = str(sy)
-                sy_df = teacher_days[teacher_days['School Year'] == sy]
-                days_per_teacher_sy = sy_df.groupby('Employee Identifier')['Total_Days'].sum()
-                n_teachers = len(days_per_teacher_sy)
-                below = len(days_per_teacher_sy[days_per_teacher_sy <= deductible])
-                in_cc = len(days_per_teacher_sy[(days_per_teacher_sy > deductible) & (days_per_teacher_sy <= cc_maximum)])
-                high = len(days_per_teacher_sy[days_per_teacher_sy > cc_maximum])
-                staff_cc_sy = days_per_teacher_sy[(days_per_teacher_sy > deductible) & (days_per_teacher_sy <= cc_maximum)]
-                cc_days_sy = sum(min(d - deductible, cc_maximum - deductible) for _, d in staff_cc_sy.items() if d > deductible)
-                high_staff_sy = days_per_teacher_sy[days_per_teacher_sy > cc_maximum]
-                if calculation_approach.get("excess_days_calculation") == "all_days":
-                    excess_sy = high_staff_sy.sum() if len(high_staff_sy) else 0
-                else:
-                    excess_sy = (high_staff_sy - cc_maximum).sum() if len(high_staff_sy) else 0
-                rc_cc_sy = replacement_cost * cc_days_sy
-                ark_sy = rc_cc_sy * ark_commission_rate
-                abcover_sy = rc_cc_sy * abcover_commission_rate
-                premium_sy = rc_cc_sy + ark_sy + abcover_sy
-                per_school_year_breakdown[sy_str] = {
-                    'total_teachers': n_teachers,
-                    'below_deductible': below,
-                    'in_cc_range': in_cc,
-                    'high_claimant': high,
-                    'total_cc_days': float(cc_days_sy),
-                    'excess_days': float(excess_sy),
-                    'replacement_cost_cc': float(rc_cc_sy),
-                    'ark_commission': float(ark_sy),
-                    'abcover_commission': float(abcover_sy),
-                    'premium': float(premium_sy),
+            # Whole breakdown as grouped reductions: per-teacher totals per year, band flags, one agg per year
+            days_sy = (
+                teacher_days.groupby(['School Year', 'Employee Identifier'], sort=False, observed=True)['Total_Days']
+                .sum()
+                .to_frame('days')
+            )
+            d = days_sy['days']
+            is_cc = (d > deductible) & (d <= cc_maximum)
+            is_high = d > cc_maximum
+            if calculation_approach.get("excess_days_calculation") == "all_days":
+                excess = d.where(is_high, 0.0)
+            else:
+                excess = (d - cc_maximum).where(is_high, 0.0)
+            days_sy = days_sy.assign(
+                below=d <= deductible,
+                in_cc=is_cc,
+                high=is_high,
+                cc_days=np.minimum(d - deductible, cc_band).where(is_cc, 0.0),
+                excess=excess,
+            )
+            by_year = days_sy.groupby(level='School Year', sort=False, observed=True).agg(
+                total_teachers=('days', 'size'),
+                below_deductible=('below', 'sum'),
+                in_cc_range=('in_cc', 'sum'),
+                high_claimant=('high', 'sum'),
+                total_cc_days=('cc_days', 'sum'),
+                excess_days=('excess', 'sum'),
+            )
+            rc_cc = by_year['total_cc_days'] * replacement_cost
+            by_year = by_year.assign(
+                replacement_cost_cc=rc_cc,
+                ark_commission=rc_cc * ark_commission_rate,
+                abcover_commission=rc_cc * abcover_commission_rate,
+            )
+            by_year['premium'] = by_year['replacement_cost_cc'] + by_year['ark_commission'] + by_year['abcover_commission']
+            for sy, row in zip(by_year.index, by_year.itertuples(index=False)):
+                per_school_year_breakdown[str(sy)] = {
+                    'total_teachers': int(row.total_teachers),
+                    'below_deductible': int(row.below_deductible),
+                    'in_cc_range': int(row.in_cc_range),
+                    'high_claimant': int(row.high_claimant),
+                    'total_cc_days': float(row.total_cc_days),
+                    'excess_days': float(row.excess_days),
+                    'replacement_cost_cc': float(row.replacement_cost_cc),
+                    'ark_commission': float(row.ark_commission),
+                    'abcover_commission': float(row.abcover_commission),
+                    'premium': float(row.premium),
                 }
         
         results = {
@@ -0,0 +1,102 @@
+"""
+School-year helpers (July 1 - June 30) shared by cleaning Rule 3 and the orchestrator.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .date_parsing import parse_absence_date_series
+
+
+# Whole years representable as datetime64[ns] (1677-09-21 .. 2262-04-11)
+_MIN_NS_YEAR = pd.Timestamp.min.year + 1
+_MAX_NS_YEAR = pd.Timestamp.max.year - 1
+
+
+@lru_cache(maxsize=256)
+def _school_year_range(label) -> Tuple[Optional[pd.Timestamp], Optional[pd.Timestamp]]:
+    """
+    Parse one School Year label and return (start_date, end_date).
+    Example: "2020-2021" -> (July 1, 2020, June 30, 2021); (None, None) if it does not parse.
+    Memoized: the same few labels recur across validation, the LLM sample check and Rule 3.
+    """
+    parts = str(label).split("-")
+    if len(parts) != 2:
+        return None, None
+    try:
+        start_year, end_year = int(parts[0]), int(parts[1])
+    except ValueError:
+        return None, None
+    # Bounds are stored as datetime64[ns]; years outside its range (e.g. "2020-21" -> year 21) stay unchecked
+    if not (_MIN_NS_YEAR <= start_year <= _MAX_NS_YEAR and _MIN_NS_YEAR <= end_year <= _MAX_NS_YEAR):
+        return None, None
+    try:
+        return (
+            pd.Timestamp(year=start_year, month=7, day=1),
+            pd.Timestamp(year=end_year, month=6, day=30),
+        )
+    except (ValueError, OverflowError, pd.errors.OutOfBoundsDatetime):
+        return None, None
+
+
+def school_year_bounds(school_year: pd.Series) -> Tuple[pd.Series, pd.Series]:
+    """
+    Parse "YYYY-YYYY" labels into (start, end) Timestamps: July 1 of the first year, June 30 of the second.
+    Labels that do not parse (or give an out-of-range year) yield NaT.
+
+    A file has only a handful of distinct school years, so the ranges are built once per
+    label (a small lookup table) and broadcast to rows through factorize codes.
+    """
+    if isinstance(school_year.dtype, pd.CategoricalDtype):
+        # Categories are already the distinct labels; codes index them (-1 = missing)
+        codes, uniques = school_year.cat.codes.to_numpy(), school_year.cat.categories
+    else:
+        codes, uniques = pd.factorize(school_year)
+    ranges = [_school_year_range(label) for label in uniques]
+    # Trailing NaT slot: factorize code -1 (missing School Year) indexes it
+    starts = pd.DatetimeIndex([r[0] for r in ranges] + [None], dtype="datetime64[ns]").to_numpy()
+    ends = pd.DatetimeIndex([r[1] for r in ranges] + [None], dtype="datetime64[ns]").to_numpy()
+    return (
+        pd.Series(starts[codes], index=school_year.index),
+        pd.Series(ends[codes], index=school_year.index),
+    )
+
+
+def school_year_date_mask(school_year: pd.Series, dates: pd.Series) -> pd.Series:
+    """
+    Row mask: True = Date falls inside its School Year, or the row cannot be checked
+    (missing School Year / Date, or unparseable School Year). A non-null Date that
+    fails to parse counts as a mismatch.
+    """
+    start, end = school_year_bounds(school_year)
+    parsed = parse_absence_date_series(dates)
+    checkable = school_year.notna() & dates.notna() & start.notna() & end.notna()
+    in_range = (parsed >= start) & (parsed <= end)
+    return ~checkable | in_range
+
+
+def school_year_from_dates(dates: pd.Series) -> pd.Series:
+    """
+    Derive "YYYY-YYYY" School Year labels from absence dates:
+    July 1+ -> current year start; before July -> previous year start.
+    Returned as a categorical (a file spans only a few school years); the label strings are
+    built once per distinct start year. Missing / unparseable dates give a missing label.
+    """
+    parsed = parse_absence_date_series(dates)
+    if isinstance(parsed.dtype, np.dtype):
+        # Naive datetime64: one pass over the buffer as months since 1970-01 (month index 6 = July)
+        values = parsed.to_numpy()
+        months = values.astype("datetime64[M]").astype(np.int64)
+        year_start = (1970 + months // 12 - (months % 12 < 6)).astype("float64")
+        year_start[np.isnat(values)] = np.nan
+    else:
+        # tz-aware: calendar fields in the column's own timezone
+        year_start = (parsed.dt.year - (parsed.dt.month < 7)).to_numpy(dtype="float64")
+    codes, starts = pd.factorize(year_start, sort=True)  # NaN (NaT date) -> code -1
+    labels = [f"{int(y)}-{int(y) + 1}" for y in starts]
+    return pd.Series(pd.Categorical.from_codes(codes, categories=labels), index=dates.index, name=dates.name)
@@ -11,14 +11,23 @@ import uuid
 from typing import Optional, List, Tuple
 import streamlit as st
 import pandas as pd
-from agents import LangGraphOrchestrator, AgentState, DataAnalysisAgent
+from agents import AgentState, DataAnalysisAgent
 from agents.data_cleaning_agent_llm import run_validation
+from agents.orchestrator_langgraph import get_orchestrator
+from agents.date_parsing import parse_absence_date_series
 from auth import init_db, check_credentials, create_user
 from audit import setup_logging, init_audit_db, init_login_events_db, get_logger, log_run, log_error, log_login_success, log_login_failure, log_logout
 from pdf_export import build_results_pdf
 from dotenv import load_dotenv
 
-load_dotenv()
+
+@st.cache_resource
+def _load_env() -> None:
+    """Read .env once per server process; the script body itself re-runs on every interaction."""
+    load_dotenv()
+
+
+_load_env()
 
 # LangSmith: when LANGCHAIN_API_KEY is set, enable tracing so you can see full prompts/responses at smith.langchain.com
 if os.getenv("LANGCHAIN_API_KEY"):
@@ -59,6 +68,12 @@ def _mapping_sanity_checks(column_map: dict) -> List[str]:
     return warnings
 
 
+def _employee_type_options(series: pd.Series) -> List[str]:
+    """Sorted, non-blank distinct values of an employee-type column (str/strip on the uniques only)."""
+    uniques = pd.Index(series.dropna().unique()).astype(str).unique()
+    return sorted(uniques[uniques.str.strip() != ""].tolist())
+
+
 def _dataframe_safe_for_display(df: pd.DataFrame, max_rows: Optional[int] = None) -> pd.DataFrame:
     """Return a copy safe for st.dataframe: all columns as string so PyArrow never fails (e.g. '$140.00' -> str). Optionally cap rows."""
     if df is None or (isinstance(df, pd.DataFrame) and df.empty):
@@ -263,7 +278,7 @@ if uploaded_file is not None:
         try:
             # Lazy-init orchestrator (and Bedrock/LLM) only when first needed
             if st.session_state.orchestrator is None:
-                st.session_state.orchestrator = LangGraphOrchestrator()
+                st.session_state.orchestrator = get_orchestrator()
             # Update state with uploaded file
             st.session_state.agent_state["uploaded_file"] = uploaded_file
             # Run upload node
@@ -484,7 +499,8 @@ if not st.session_state.agent_state["raw_data"].empty:
         if 'Date' in available_columns:
             date_col = df_raw['Date']
             try:
-                dt = pd.to_datetime(date_col, errors='coerce')
+                # Same parser as cleaning: mixed ISO / US formats, each distinct value parsed once
+                dt = parse_absence_date_series(date_col)
                 min_d, max_d = dt.min(), dt.max()
                 if pd.notna(min_d) and pd.notna(max_d):
                     st.caption(f"📅 Dates in data: {min_d.strftime('%Y-%m-%d')} to {max_d.strftime('%Y-%m-%d')} (filtered by School Year in cleaning)")
@@ -495,11 +511,9 @@ if not st.session_state.agent_state["raw_data"].empty:
         # Use chips + Remove buttons so the list doesn't jump to the end when you remove an item (multiselect scroll bug).
         employee_type_raw_col = next((orig for orig, std in column_map.items() if std == "Employee Type"), None)
         if employee_type_raw_col and employee_type_raw_col in df_raw.columns:
-            employee_types = df_raw[employee_type_raw_col].dropna().astype(str).unique().tolist()
-            employee_types = sorted([x for x in employee_types if x.strip()])
+            employee_types = _employee_type_options(df_raw[employee_type_raw_col])
         elif 'Employee Type' in available_columns:
-            employee_types = df_raw['Employee Type'].dropna().astype(str).unique().tolist()
-            employee_types = sorted([x for x in employee_types if x.strip()])
+            employee_types = _employee_type_options(df_raw['Employee Type'])
         else:
             employee_types = []
 
@@ -559,7 +573,7 @@ if not st.session_state.agent_state["raw_data"].empty:
         with st.spinner("Selecting data..."):
             try:
                 if st.session_state.orchestrator is None:
-                    st.session_state.orchestrator = LangGraphOrchestrator()
+                    st.session_state.orchestrator = get_orchestrator()
                 select_state = st.session_state.agent_state.copy()
                 select_result = st.session_state.orchestrator._select_node(select_state)
                 st.session_state.agent_state.update(select_result)
@@ -645,7 +659,7 @@ if not st.session_state.agent_state["selected_data"].empty:
             try:
                 # Run clean node (LLM-powered)
                 if st.session_state.orchestrator is None:
-                    st.session_state.orchestrator = LangGraphOrchestrator()
+                    st.session_state.orchestrator = get_orchestrator()
                 clean_state = st.session_state.agent_state.copy()
                 clean_result = st.session_state.orchestrator._clean_node(clean_state)
                 st.session_state.agent_state.update(clean_result)
@@ -765,7 +779,7 @@ if not st.session_state.agent_state["cleaned_data"].empty:
             try:
                 # Run calculate node (LLM-powered)
                 if st.session_state.orchestrator is None:
-                    st.session_state.orchestrator = LangGraphOrchestrator()
+                    st.session_state.orchestrator = get_orchestrator()
                 calc_state = st.session_state.agent_state.copy()
                 calc_result = st.session_state.orchestrator._calculate_node(calc_state)
                 st.session_state.agent_state.update(calc_result)
@@ -859,47 +873,34 @@ if st.session_state.agent_state.get("rating_results"):
     if results.get("per_school_year_metrics"):
         st.subheader("📊 School Year Metrics (From Cleaned Data)")
         
-        table_data = []
-        total_staff_sum = 0
-        total_absences_sum = 0
-        total_replacement_cost_sum = 0
-        school_year_count = 0
-        per_school_year_metrics = results["per_school_year_metrics"]
-        sorted_school_years = sorted(per_school_year_metrics.keys())
-        
-        for school_year in sorted_school_years:
-            metrics = per_school_year_metrics[school_year]
-            table_data.append({
-                "School Year": school_year,
-                "Total # Of Staff": f"{metrics['total_staff']:,}",
-                "Total # of Absences": f"{metrics['total_absences']:,.2f}",
-                "Replacement Cost Per Day ($)": f"${replacement_cost:.2f}",
-                "Total Replacement Cost to District ($)": f"${metrics['total_replacement_cost']:,.2f}",
-                "Amt. of School Year Days": school_year_days,
-                "Deductible (Days)": deductible,
-                "CC Max (Days)": cc_days
-            })
-            total_staff_sum += metrics['total_staff']
-            total_absences_sum += metrics['total_absences']
-            total_replacement_cost_sum += metrics['total_replacement_cost']
-            school_year_count += 1
+        # Numeric frame first (one row per school year); format each column once for display
+        metrics_df = pd.DataFrame.from_dict(results["per_school_year_metrics"], orient="index").sort_index()
+        table_df = pd.DataFrame({
+            "School Year": metrics_df.index.to_numpy(),
+            "Total # Of Staff": metrics_df["total_staff"].map("{:,}".format).to_numpy(),
+            "Total # of Absences": metrics_df["total_absences"].map("{:,.2f}".format).to_numpy(),
+            "Replacement Cost Per Day ($)": f"${replacement_cost:.2f}",
+            "Total Replacement Cost to District ($)": metrics_df["total_replacement_cost"].map("${:,.2f}".format).to_numpy(),
+            "Amt. of School Year Days": school_year_days,
+            "Deductible (Days)": deductible,
+            "CC Max (Days)": cc_days
+        })
         
-        if school_year_count > 1:
-            avg_staff = total_staff_sum / school_year_count
-            avg_absences = total_absences_sum / school_year_count
-            avg_replacement_cost = total_replacement_cost_sum / school_year_count
-            table_data.append({
+        if len(metrics_df) > 1:
+            avg = metrics_df[["total_staff", "total_absences", "total_replacement_cost"]].mean()
+            avg_row = pd.DataFrame([{
                 "School Year": "5-Yr Avg",
-                "Total # Of Staff": f"{avg_staff:,.1f}",
-                "Total # of Absences": f"{avg_absences:,.1f}",
+                "Total # Of Staff": f"{avg['total_staff']:,.1f}",
+                "Total # of Absences": f"{avg['total_absences']:,.1f}",
                 "Replacement Cost Per Day ($)": f"${replacement_cost:.2f}",
-                "Total Replacement Cost to District ($)": f"${avg_replacement_cost:,.2f}",
+                "Total Replacement Cost to District ($)": f"${avg['total_replacement_cost']:,.2f}",
                 "Amt. of School Year Days": school_year_days,
                 "Deductible (Days)": deductible,
                 "CC Max (Days)": cc_days
-            })
+            }])
+            table_df = pd.concat([table_df, avg_row], ignore_index=True)
         
-        st.dataframe(_dataframe_safe_for_display(pd.DataFrame(table_data)), width="stretch", hide_index=True)
+        st.dataframe(_dataframe_safe_for_display(table_df), width="stretch", hide_index=True)
         st.info(f"📊 **Overall (Cumulative over 5 years):** {results.get('overall_total_staff', 0):,} staff, {results.get('overall_total_absences', 0):,.2f} absences, ${results.get('overall_total_replacement_cost', 0):,.2f} total replacement cost")
         with st.expander("❓ How are these numbers calculated? How do I verify?"):
             st.markdown("""
@@ -938,60 +939,39 @@ if st.session_state.agent_state.get("rating_results"):
             st.markdown("---")
             st.write("**📅 Calculation Breakdown by School Year**")
             breakdown = results["per_school_year_breakdown"]
-            by_year_rows = []
-            for sy in sorted(breakdown.keys()):
-                b = breakdown[sy]
-                by_year_rows.append({
-                    "School Year": sy,
-                    "Total Teachers": f"{b['total_teachers']:,}",
-                    "Below Deductible": f"{b['below_deductible']:,}",
-                    "In CC Range": f"{b['in_cc_range']:,}",
-                    "High Claimant": f"{b['high_claimant']:,}",
+            # One frame (sorted once by school year) feeds both the per-year rows and the average row
+            breakdown_fields = [
+                "total_teachers", "below_deductible", "in_cc_range", "high_claimant", "total_cc_days",
+                "excess_days", "replacement_cost_cc", "ark_commission", "abcover_commission", "premium",
+            ]
+            breakdown_df = (
+                pd.DataFrame.from_dict(breakdown, orient="index")
+                .reindex(columns=breakdown_fields)
+                .fillna(0)
+                .sort_index()
+            )
+
+            def _breakdown_row(label, b, count_fmt):
+                return {
+                    "School Year": label,
+                    "Total Teachers": f"{b['total_teachers']:{count_fmt}}",
+                    "Below Deductible": f"{b['below_deductible']:{count_fmt}}",
+                    "In CC Range": f"{b['in_cc_range']:{count_fmt}}",
+                    "High Claimant": f"{b['high_claimant']:{count_fmt}}",
                     "Total CC Days": f"{b['total_cc_days']:,.2f}",
                     "Excess Days": f"{b['excess_days']:,.2f}",
-                    "Replacement Cost ($)": f"${b.get('replacement_cost_cc', 0):,.2f}",
-                    "Carrier Profit Margin ($)": f"${b.get('ark_commission', 0):,.2f}",
-                    "ABCover Acquisition Costs ($)": f"${b.get('abcover_commission', 0):,.2f}",
+                    "Replacement Cost ($)": f"${b['replacement_cost_cc']:,.2f}",
+                    "Carrier Profit Margin ($)": f"${b['ark_commission']:,.2f}",
+                    "ABCover Acquisition Costs ($)": f"${b['abcover_commission']:,.2f}",
                     "Premium ($)": f"${b['premium']:,.2f}",
-                })
-            # Average row (last row)
-            n_years = len(breakdown)
-            if n_years > 0:
-                sum_teachers = sum(b['total_teachers'] for b in breakdown.values())
-                sum_below = sum(b['below_deductible'] for b in breakdown.values())
-                sum_cc = sum(b['in_cc_range'] for b in breakdown.values())
-                sum_high = sum(b['high_claimant'] for b in breakdown.values())
-                sum_cc_days = sum(b['total_cc_days'] for b in breakdown.values())
-                sum_excess = sum(b['excess_days'] for b in breakdown.values())
-                sum_rc = sum(b.get('replacement_cost_cc', 0) for b in breakdown.values())
-                sum_ark = sum(b.get('ark_commission', 0) for b in breakdown.values())
-                sum_abcover = sum(b.get('abcover_commission', 0) for b in breakdown.values())
-                sum_premium = sum(b['premium'] for b in breakdown.values())
-                avg_metrics = {
-                    'total_teachers': sum_teachers / n_years,
-                    'below_deductible': sum_below / n_years,
-                    'in_cc_range': sum_cc / n_years,
-                    'high_claimant': sum_high / n_years,
-                    'total_cc_days': sum_cc_days / n_years,
-                    'excess_days': sum_excess / n_years,
-                    'replacement_cost_cc': sum_rc / n_years,
-                    'ark_commission': sum_ark / n_years,
-                    'abcover_commission': sum_abcover / n_years,
-                    'premium': sum_premium / n_years,
                 }
-                by_year_rows.append({
-                    "School Year": "5 yr Avg",
-                    "Total Teachers": f"{avg_metrics['total_teachers']:,.1f}",
-                    "Below Deductible": f"{avg_metrics['below_deductible']:,.1f}",
-                    "In CC Range": f"{avg_metrics['in_cc_range']:,.1f}",
-                    "High Claimant": f"{avg_metrics['high_claimant']:,.1f}",
-                    "Total CC Days": f"{avg_metrics['total_cc_days']:,.2f}",
-                    "Excess Days": f"{avg_metrics['excess_days']:,.2f}",
-                    "Replacement Cost ($)": f"${avg_metrics['replacement_cost_cc']:,.2f}",
-                    "Carrier Profit Margin ($)": f"${avg_metrics['ark_commission']:,.2f}",
-                    "ABCover Acquisition Costs ($)": f"${avg_metrics['abcover_commission']:,.2f}",
-                    "Premium ($)": f"${avg_metrics['premium']:,.2f}",
-                })
+
+            by_year_rows = [
+                _breakdown_row(sy, b, ",") for sy, b in breakdown_df.to_dict(orient="index").items()
+            ]
+            # Average row (last row)
+            if len(breakdown_df) > 0:
+                by_year_rows.append(_breakdown_row("5 yr Avg", breakdown_df.mean(), ",.1f"))
             st.dataframe(_dataframe_safe_for_display(pd.DataFrame(by_year_rows)), width="stretch", hide_index=True)
             st.caption("Each row shows metrics for **that school year only** (not cumulative). Last row is **average** across years.")
         if results.get("cc_range_details"):
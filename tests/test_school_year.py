@@ -0,0 +1,18 @@
+"""Regression tests for agents.school_year."""
+
+import pandas as pd
+
+from agents.school_year import school_year_bounds, school_year_date_mask
+
+
+def test_two_digit_end_year_is_left_unchecked():
+    # "2020-21" parses to year 21, outside datetime64[ns]; the row must not crash Rule 3
+    school_year = pd.Series(["2020-21", "20-21", "2020-2021", "2020-2021"])
+    dates = pd.Series(["2020-09-01", "2020-09-01", "2020-09-01", "2022-01-01"])
+    assert school_year_date_mask(school_year, dates).tolist() == [True, True, True, False]
+
+
+def test_out_of_range_labels_give_nat_bounds():
+    start, end = school_year_bounds(pd.Series(["2020-21", "2020-2021"]))
+    assert start.isna().tolist() == [True, False]
+    assert end.isna().tolist() == [True, False]